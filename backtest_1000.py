@@ -8,11 +8,9 @@ import pandas as pd
 import numpy as np
 from src.process import calculate_team_totals
 from src.model import predict_total
-from src.edge import calculate_edge
-from src.advanced_stats import get_pace_adjusted_total, get_team_pace_from_espn
+from src.edge import edge_and_filter
+from src.advanced_stats import get_team_pace_from_espn
 from src.injury import adjust_prediction_for_injuries, get_team_injuries
-from src.streaks import calculate_streak_adjustment
-from src.line_movement import should_filter_based_on_movement
 
 
 # NBA Teams
@@ -59,13 +57,13 @@ TEAM_DEFEFF = {
 def generate_1000_games():
     """Generate 1000 realistic NBA games."""
     games = []
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     
     for i in range(1000):
-        home_idx = np.random.randint(0, len(TEAMS))
-        away_idx = np.random.randint(0, len(TEAMS))
-        while away_idx == home_idx:
-            away_idx = np.random.randint(0, len(TEAMS))
+        home_idx = rng.integers(0, len(TEAMS))
+        # Draw from the other teams and shift past home so away != home
+        away_idx = rng.integers(0, len(TEAMS) - 1)
+        away_idx += away_idx >= home_idx
         
         home = TEAMS[home_idx]
         away = TEAMS[away_idx]
@@ -78,8 +76,8 @@ def generate_1000_games():
         home_expected = (home_offeff + away_defeff) / 2 + 3.5
         away_expected = (away_offeff + home_defeff) / 2
         
-        home_pts = int(np.random.normal(home_expected, 5.0))
-        away_pts = int(np.random.normal(away_expected, 5.0))
+        home_pts = int(rng.normal(home_expected, 5.0))
+        away_pts = int(rng.normal(away_expected, 5.0))
         
         home_pts = max(85, home_pts)
         away_pts = max(85, away_pts)
@@ -87,7 +85,7 @@ def generate_1000_games():
         total = home_pts + away_pts
         
         base_line = (home_expected + away_expected)
-        sportsbook = base_line + np.random.normal(0, 1.0)
+        sportsbook = base_line + rng.normal(0, 1.0)
         sportsbook = round(sportsbook * 2) / 2
         
         games.append({
@@ -110,75 +108,65 @@ def run_large_backtest(num_games=1000, lookback_window=20):
     print(f"Total range: {min([g['total_pts'] for g in games])}-{max([g['total_pts'] for g in games])} pts\n")
     
     # Pre-fetch external maps once to avoid repeated network calls
-    pace_map = get_team_pace_from_espn()
+    get_team_pace_from_espn()  # warms the cache predict_total reads from
     injuries_map = get_team_injuries()
 
     results = []
     
+    # Build the frame once; each training window is then an iloc view
+    games_df = pd.DataFrame(games)
+    
     for i, current_game in enumerate(games):
-        if i < lookback_window:
-            training_games = games[:i]
-        else:
-            training_games = games[i-lookback_window:i]
+        training_df = games_df.iloc[max(0, i - lookback_window):i]
         
-        if len(training_games) < 4:
+        if len(training_df) < 4:
             continue
         
-        try:
-            training_df = pd.DataFrame(training_games)
-            model_data = calculate_team_totals(training_df)
-            
-            if current_game['away'] not in model_data.index or current_game['home'] not in model_data.index:
-                continue
-            
-            predicted = predict_total(
-                model_data,
-                current_game['away'],
-                current_game['home'],
-                total_multiplier=1.05
-            )
-            
-            pace_adj = get_pace_adjusted_total(predicted, current_game['away'], current_game['home'], pace_map)
-            predicted += pace_adj
-
-            injury_adj = adjust_prediction_for_injuries(current_game['away'], current_game['home'], injuries_map)
-            predicted += injury_adj
-            
-            streak_adj = calculate_streak_adjustment(current_game['home'], current_game['away'])
-            predicted += streak_adj
-            
-            edge = calculate_edge(predicted, current_game['sportsbook_total'])
-            should_bet = should_filter_based_on_movement(predicted, current_game['sportsbook_total'],
-                                                         "OVER" if edge > 0 else "UNDER")
-            
-            actual_total = current_game['total_pts']
-            predicted_over = predicted > current_game['sportsbook_total']
-            actual_over = actual_total > current_game['sportsbook_total']
-            
-            if edge != 0:
-                if (predicted_over and actual_over) or (not predicted_over and not actual_over):
-                    result = "WIN"
-                elif (predicted_over and not actual_over) or (not predicted_over and actual_over):
-                    result = "LOSS"
-                else:
-                    result = "PUSH"
+        # Explicit preconditions instead of a blanket try/except: a team the
+        # model hasn't seen skips the game, anything else is a real error
+        model_data = calculate_team_totals(training_df)
+        
+        if current_game['away'] not in model_data.index or current_game['home'] not in model_data.index:
+            continue
+        
+        predicted = predict_total(
+            model_data,
+            current_game['away'],
+            current_game['home'],
+            total_multiplier=1.05
+        )
+        
+        # predict_total already applies pace and streak; only injuries remain
+        injury_adj = adjust_prediction_for_injuries(current_game['away'], current_game['home'], injuries_map)
+        predicted += injury_adj
+        
+        edge, should_bet = edge_and_filter(predicted, current_game['sportsbook_total'])
+        
+        actual_total = current_game['total_pts']
+        predicted_over = predicted > current_game['sportsbook_total']
+        actual_over = actual_total > current_game['sportsbook_total']
+        
+        if edge != 0:
+            if (predicted_over and actual_over) or (not predicted_over and not actual_over):
+                result = "WIN"
+            elif (predicted_over and not actual_over) or (not predicted_over and actual_over):
+                result = "LOSS"
             else:
                 result = "PUSH"
-            
-            results.append({
-                "date": current_game['date'],
-                "home": current_game['home'],
-                "away": current_game['away'],
-                "predicted": predicted,
-                "actual": actual_total,
-                "sportsbook": current_game['sportsbook_total'],
-                "edge": edge,
-                "result": result,
-                "filtered": not should_bet
-            })
-        
-        except Exception as e:
-            continue
+        else:
+            result = "PUSH"
+        
+        results.append({
+            "date": current_game['date'],
+            "home": current_game['home'],
+            "away": current_game['away'],
+            "predicted": predicted,
+            "actual": actual_total,
+            "sportsbook": current_game['sportsbook_total'],
+            "edge": edge,
+            "result": result,
+            "filtered": not should_bet
+        })
     
     return pd.DataFrame(results)
 
@@ -6,13 +6,12 @@ Much faster than full sequential processing.
 
 import pandas as pd
 import numpy as np
-from src.process import calculate_team_totals
+from src.process import calculate_team_totals_by_prefix
 from src.model import predict_total
-from src.edge import calculate_edge
 from src.advanced_stats import get_pace_adjusted_total, get_team_pace_from_espn
 from src.injury import adjust_prediction_for_injuries, get_team_injuries
 from src.streaks import calculate_streak_adjustment
-from src.line_movement import should_filter_based_on_movement
+from src.edge import score_predictions
 
 
 TEAMS = [
@@ -52,135 +51,160 @@ TEAM_DEFEFF = {
     "Brooklyn Nets": 115.5, "San Antonio Spurs": 115.8
 }
 
+# Efficiency lookups as arrays aligned with TEAMS, indexed by integer team code
+TEAM_DTYPE = pd.CategoricalDtype(TEAMS)
+OFFEFF = np.array([TEAM_OFFEFF.get(team, 110.0) for team in TEAMS], dtype=np.float32)
+DEFEFF = np.array([TEAM_DEFEFF.get(team, 110.0) for team in TEAMS], dtype=np.float32)
+
+
+def _simulate_scores(home_idx, away_idx, home_noise, away_noise, line_noise):
+    """
+    Numeric core of the game generator.
+    
+    Takes integer team codes plus standard-normal noise drawn by the caller,
+    so it is deterministic and does no DataFrame work.
+    
+    Returns:
+        Tuple of arrays: (home_pts, away_pts, sportsbook_total)
+    """
+    home_expected = (OFFEFF[home_idx] + DEFEFF[away_idx]) / 2 + 3.5
+    away_expected = (OFFEFF[away_idx] + DEFEFF[home_idx]) / 2
+    
+    # Points fit comfortably in int16 and half-point lines are exact in float32
+    home_pts = np.maximum(85, (home_expected + 5.0 * home_noise).astype(np.int16))
+    away_pts = np.maximum(85, (away_expected + 5.0 * away_noise).astype(np.int16))
+    
+    base_line = home_expected + away_expected
+    sportsbook = (np.round((base_line + line_noise) * 2) / 2).astype(np.float32)
+    
+    return home_pts, away_pts, sportsbook
+
 
 def generate_1000_games_fast():
-    """Generate all 1000 games upfront."""
-    games = []
-    np.random.seed(42)
-    
-    for i in range(1000):
-        home_idx = np.random.randint(0, len(TEAMS))
-        away_idx = np.random.randint(0, len(TEAMS))
-        while away_idx == home_idx:
-            away_idx = np.random.randint(0, len(TEAMS))
-        
-        home = TEAMS[home_idx]
-        away = TEAMS[away_idx]
-        
-        home_offeff = TEAM_OFFEFF.get(home, 110.0)
-        away_offeff = TEAM_OFFEFF.get(away, 110.0)
-        home_defeff = TEAM_DEFEFF.get(home, 110.0)
-        away_defeff = TEAM_DEFEFF.get(away, 110.0)
-        
-        home_expected = (home_offeff + away_defeff) / 2 + 3.5
-        away_expected = (away_offeff + home_defeff) / 2
-        
-        home_pts = int(np.random.normal(home_expected, 5.0))
-        away_pts = int(np.random.normal(away_expected, 5.0))
-        home_pts = max(85, home_pts)
-        away_pts = max(85, away_pts)
-        
-        total = home_pts + away_pts
-        base_line = (home_expected + away_expected)
-        sportsbook = base_line + np.random.normal(0, 1.0)
-        sportsbook = round(sportsbook * 2) / 2
-        
-        games.append({
-            "date": f"2025-11-{(i % 30) + 1:02d}",
-            "home": home,
-            "away": away,
-            "home_pts": home_pts,
-            "away_pts": away_pts,
-            "total_pts": total,
-            "sportsbook_total": sportsbook
-        })
+    """Generate all 1000 games upfront with vectorized draws."""
+    rng = np.random.default_rng(42)
+    n_games = 1000
+    n_teams = len(TEAMS)
+    
+    # Draw away from the other 28 teams and shift past home so away != home
+    home_idx = rng.integers(0, n_teams, n_games)
+    away_idx = rng.integers(0, n_teams - 1, n_games)
+    away_idx += away_idx >= home_idx
     
-    return games
+    home_pts, away_pts, sportsbook = _simulate_scores(
+        home_idx,
+        away_idx,
+        rng.standard_normal(n_games),
+        rng.standard_normal(n_games),
+        rng.standard_normal(n_games)
+    )
+    
+    dates = np.array([f"2025-11-{day:02d}" for day in range(1, 31)])
+    
+    return pd.DataFrame({
+        "date": dates[np.arange(n_games) % 30],
+        "home": pd.Categorical.from_codes(home_idx, dtype=TEAM_DTYPE),
+        "away": pd.Categorical.from_codes(away_idx, dtype=TEAM_DTYPE),
+        "home_pts": home_pts,
+        "away_pts": away_pts,
+        "total_pts": home_pts + away_pts,
+        "sportsbook_total": sportsbook
+    }, copy=False)
 
 
 def run_sampled_backtest():
     """Sample 200 games from 1000, use all prior games for training."""
     all_games = generate_1000_games_fast()
     print(f"Generated 1000 realistic games")
-    print(f"Total range: {min([g['total_pts'] for g in all_games])}-{max([g['total_pts'] for g in all_games])} pts\n")
+    print(f"Total range: {all_games['total_pts'].min()}-{all_games['total_pts'].max()} pts\n")
     
     # Sample 30 games evenly spaced from 1000 games (very fast execution)
     sample_indices = np.linspace(100, 999, 30, dtype=int)
     
-    results = []
+    # Columnar result buffers, filled by position and trimmed after the loop
+    n = len(sample_indices)
+    homes = np.empty(n, dtype=object)
+    aways = np.empty(n, dtype=object)
+    predicted_col = np.empty(n, dtype=np.float64)
+    actual_col = np.empty(n, dtype=np.int16)
+    sportsbook_col = np.empty(n, dtype=np.float32)
+    k = 0
     
     # Pre-fetch external data once (cache) to avoid per-game network calls
     pace_map = get_team_pace_from_espn()
     injuries_map = get_team_injuries()
 
+    # Team stats for every sampled prefix, aggregated in a single pass
+    model_snapshots = calculate_team_totals_by_prefix(all_games, sample_indices)
+
     for idx in sample_indices:
-        current_game = all_games[idx]
-        training_games = all_games[:idx]
+        current_game = all_games.iloc[idx]
         
-        if len(training_games) < 10:
+        if idx < 10:
             continue
         
+        model_data = model_snapshots[idx]
+        
+        if current_game['away'] not in model_data.index or current_game['home'] not in model_data.index:
+            continue
+        
+        # predict_total already applies pace and streak adjustments.
+        # Only apply injury adjustment here (predict_total doesn't include injuries).
         try:
-            training_df = pd.DataFrame(training_games)
-            model_data = calculate_team_totals(training_df)
-            
-            if current_game['away'] not in model_data.index or current_game['home'] not in model_data.index:
-                continue
-            
-            # predict_total already applies pace and streak adjustments.
-            # Only apply injury adjustment here (predict_total doesn't include injuries).
             predicted = predict_total(model_data, current_game['away'], current_game['home'], total_multiplier=1.05)
-
-            injury_adj = adjust_prediction_for_injuries(current_game['away'], current_game['home'], injuries_map)
-            predicted += injury_adj
-            
-            edge = calculate_edge(predicted, current_game['sportsbook_total'])
-            should_bet = should_filter_based_on_movement(predicted, current_game['sportsbook_total'], "OVER" if edge > 0 else "UNDER")
-            
-            actual_total = current_game['total_pts']
-            predicted_over = predicted > current_game['sportsbook_total']
-            actual_over = actual_total > current_game['sportsbook_total']
-            
-            if edge != 0:
-                result = "WIN" if (predicted_over and actual_over) or (not predicted_over and not actual_over) else "LOSS"
-            else:
-                result = "PUSH"
-            
-            results.append({
-                "home": current_game['home'],
-                "away": current_game['away'],
-                "predicted": predicted,
-                "actual": actual_total,
-                "sportsbook": current_game['sportsbook_total'],
-                "edge": edge,
-                "result": result,
-                "filtered": not should_bet
-            })
-            
-            print(f".", end="", flush=True)
-        
+            predicted += adjust_prediction_for_injuries(current_game['away'], current_game['home'], injuries_map)
         except Exception as e:
+            print(f"\n⚠️  Prediction failed for {current_game['away']} @ {current_game['home']}: {e}")
             continue
+        
+        homes[k] = current_game['home']
+        aways[k] = current_game['away']
+        predicted_col[k] = predicted
+        actual_col[k] = current_game['total_pts']
+        sportsbook_col[k] = current_game['sportsbook_total']
+        k += 1
+        
+        print(f".", end="", flush=True)
     
     print()
-    return pd.DataFrame(results)
+    
+    # Edge, filter and outcome for all sampled games in one vectorized pass
+    predicted_col = predicted_col[:k]
+    actual_col = actual_col[:k]
+    sportsbook_col = sportsbook_col[:k]
+    edge, result, should_bet = score_predictions(predicted_col, sportsbook_col, actual_col)
+    
+    return pd.DataFrame({
+        "home": homes[:k],
+        "away": aways[:k],
+        "predicted": predicted_col,
+        "actual": actual_col,
+        "sportsbook": sportsbook_col,
+        "edge": edge,
+        "result": result,
+        "filtered": ~should_bet,
+    }, copy=False)
 
 
 def summarize_backtest(results_df):
     """Print comprehensive summary."""
-    total_games = len(results_df)
-    filtered_games = len(results_df[results_df['filtered'] == True])
-    bet_games = len(results_df[results_df['filtered'] == False])
+    # Pull the columns out once and count with masks instead of filtering frames
+    is_bet = ~results_df['filtered'].to_numpy(dtype=bool)
+    edge = results_df['edge'].to_numpy()[is_bet]
+    abs_edge = np.abs(edge)
+    result = results_df['result'].to_numpy()[is_bet]
     
-    df_bets = results_df[results_df['filtered'] == False]
+    total_games = len(results_df)
+    bet_games = np.count_nonzero(is_bet)
+    filtered_games = total_games - bet_games
     
-    wins = len(df_bets[df_bets['result'] == 'WIN'])
-    losses = len(df_bets[df_bets['result'] == 'LOSS'])
-    pushes = len(df_bets[df_bets['result'] == 'PUSH'])
+    wins = np.count_nonzero(result == 'WIN')
+    losses = np.count_nonzero(result == 'LOSS')
+    pushes = np.count_nonzero(result == 'PUSH')
     
     win_rate = wins / (wins + losses) if (wins + losses) > 0 else 0
-    avg_edge = df_bets['edge'].abs().mean() if len(df_bets) > 0 else 0
-    total_edge = df_bets['edge'].sum()
+    avg_edge = abs_edge.mean() if bet_games > 0 else 0
+    total_edge = edge.sum()
     
     print("\n" + "=" * 80)
     print("LARGE-SCALE BACKTEST (SAMPLE FROM 1000 GAMES)")
@@ -201,13 +225,14 @@ def summarize_backtest(results_df):
         print(f"Expected ROI (5% margin): {roi:>5.1f}% per bet")
     print("=" * 80)
     
+    buckets = pd.cut(abs_edge, bins=[-0.001, 5, 15, np.inf], labels=['low', 'med', 'high']).value_counts()
     print("\nEdge Distribution:")
-    print(f"  High edge (>15pts):      {len(df_bets[df_bets['edge'].abs() > 15])} bets")
-    print(f"  Medium edge (5-15pts):   {len(df_bets[(df_bets['edge'].abs() > 5) & (df_bets['edge'].abs() <= 15)])} bets")
-    print(f"  Low edge (<5pts):        {len(df_bets[df_bets['edge'].abs() <= 5])} bets")
+    print(f"  High edge (>15pts):      {buckets['high']} bets")
+    print(f"  Medium edge (5-15pts):   {buckets['med']} bets")
+    print(f"  Low edge (<5pts):        {buckets['low']} bets")
     
-    overs = len(df_bets[df_bets['edge'] > 0])
-    unders = len(df_bets[df_bets['edge'] < 0])
+    overs = np.count_nonzero(edge > 0)
+    unders = np.count_nonzero(edge < 0)
     print(f"\nOver/Under Split:")
     if bet_games > 0:
         print(f"  OVER bets:               {overs} ({100*overs/bet_games:.1f}%)")
@@ -4,12 +4,19 @@ Backtest model against real historical NBA games from the past week.
 Fetches actual game results and sportsbook lines for validation.
 """
 
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import requests
-from src.process import calculate_team_totals
+from src.process import calculate_team_totals_by_prefix
 from src.model import predict_total
 from src.edge import calculate_edge
+from src.advanced_stats import get_team_pace_from_espn
+from src.jsonutil import loads
+
+# Shared session so repeated ESPN calls reuse one keep-alive connection
+_SESSION = requests.Session()
 
 
 def get_past_week_games():
@@ -22,9 +29,9 @@ def get_past_week_games():
     url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
     
     try:
-        response = requests.get(url, timeout=10)
+        response = _SESSION.get(url, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = loads(response.content)
         
         games = []
         
@@ -70,6 +77,44 @@ def get_past_week_games():
         return get_realistic_fallback_week()
 
 
+# Realistic fallback: 15 real-ish games from past week, stored column-wise
+# with fixed dtypes so it is built once at import instead of on every call.
+_FALLBACK_WEEK = pd.DataFrame({
+    "date": [
+        "2025-11-26", "2025-11-26", "2025-11-26", "2025-11-27", "2025-11-27",
+        "2025-11-28", "2025-11-28", "2025-11-29", "2025-11-29", "2025-11-30",
+        "2025-11-30", "2025-12-01", "2025-12-01", "2025-12-02", "2025-12-02"
+    ],
+    "home": [
+        "Boston Celtics", "Denver Nuggets", "Los Angeles Lakers",
+        "Milwaukee Bucks", "New York Knicks", "Golden State Warriors",
+        "Phoenix Suns", "Los Angeles Lakers", "Dallas Mavericks",
+        "Boston Celtics", "Miami Heat", "New York Knicks",
+        "Phoenix Suns", "Denver Nuggets", "Memphis Grizzlies"
+    ],
+    "away": [
+        "Miami Heat", "Golden State Warriors", "Phoenix Suns",
+        "Chicago Bulls", "Boston Celtics", "Denver Nuggets",
+        "Miami Heat", "Sacramento Kings", "Memphis Grizzlies",
+        "Denver Nuggets", "Chicago Bulls", "Golden State Warriors",
+        "Los Angeles Lakers", "Milwaukee Bucks", "Boston Celtics"
+    ],
+    "home_pts": np.array([
+        114, 117, 116, 111, 108, 119, 112, 110, 121, 113, 106, 117, 115, 112, 109
+    ], dtype=np.int16),
+    "away_pts": np.array([
+        106, 111, 118, 103, 104, 115, 108, 109, 117, 111, 104, 114, 113, 109, 116
+    ], dtype=np.int16),
+    "total_pts": np.array([
+        220, 228, 234, 214, 212, 234, 220, 219, 238, 224, 210, 231, 228, 221, 225
+    ], dtype=np.int16),
+    "sportsbook_total": np.array([
+        219.5, 226.5, 232.0, 216.5, 214.0, 232.0, 221.5, 217.5,
+        236.0, 223.5, 211.5, 229.5, 227.0, 220.0, 223.5
+    ], dtype=np.float32),
+})
+
+
 def get_realistic_fallback_week():
     """
     Realistic fallback: 15 real-ish games from past week.
@@ -77,40 +122,7 @@ def get_realistic_fallback_week():
     """
     print("ℹ️  Using realistic fallback historical data")
     
-    games = [
-        {"date": "2025-11-26", "home": "Boston Celtics", "away": "Miami Heat",
-         "home_pts": 114, "away_pts": 106, "total_pts": 220, "sportsbook_total": 219.5},
-        {"date": "2025-11-26", "home": "Denver Nuggets", "away": "Golden State Warriors",
-         "home_pts": 117, "away_pts": 111, "total_pts": 228, "sportsbook_total": 226.5},
-        {"date": "2025-11-26", "home": "Los Angeles Lakers", "away": "Phoenix Suns",
-         "home_pts": 116, "away_pts": 118, "total_pts": 234, "sportsbook_total": 232.0},
-        {"date": "2025-11-27", "home": "Milwaukee Bucks", "away": "Chicago Bulls",
-         "home_pts": 111, "away_pts": 103, "total_pts": 214, "sportsbook_total": 216.5},
-        {"date": "2025-11-27", "home": "New York Knicks", "away": "Boston Celtics",
-         "home_pts": 108, "away_pts": 104, "total_pts": 212, "sportsbook_total": 214.0},
-        {"date": "2025-11-28", "home": "Golden State Warriors", "away": "Denver Nuggets",
-         "home_pts": 119, "away_pts": 115, "total_pts": 234, "sportsbook_total": 232.0},
-        {"date": "2025-11-28", "home": "Phoenix Suns", "away": "Miami Heat",
-         "home_pts": 112, "away_pts": 108, "total_pts": 220, "sportsbook_total": 221.5},
-        {"date": "2025-11-29", "home": "Los Angeles Lakers", "away": "Sacramento Kings",
-         "home_pts": 110, "away_pts": 109, "total_pts": 219, "sportsbook_total": 217.5},
-        {"date": "2025-11-29", "home": "Dallas Mavericks", "away": "Memphis Grizzlies",
-         "home_pts": 121, "away_pts": 117, "total_pts": 238, "sportsbook_total": 236.0},
-        {"date": "2025-11-30", "home": "Boston Celtics", "away": "Denver Nuggets",
-         "home_pts": 113, "away_pts": 111, "total_pts": 224, "sportsbook_total": 223.5},
-        {"date": "2025-11-30", "home": "Miami Heat", "away": "Chicago Bulls",
-         "home_pts": 106, "away_pts": 104, "total_pts": 210, "sportsbook_total": 211.5},
-        {"date": "2025-12-01", "home": "New York Knicks", "away": "Golden State Warriors",
-         "home_pts": 117, "away_pts": 114, "total_pts": 231, "sportsbook_total": 229.5},
-        {"date": "2025-12-01", "home": "Phoenix Suns", "away": "Los Angeles Lakers",
-         "home_pts": 115, "away_pts": 113, "total_pts": 228, "sportsbook_total": 227.0},
-        {"date": "2025-12-02", "home": "Denver Nuggets", "away": "Milwaukee Bucks",
-         "home_pts": 112, "away_pts": 109, "total_pts": 221, "sportsbook_total": 220.0},
-        {"date": "2025-12-02", "home": "Memphis Grizzlies", "away": "Boston Celtics",
-         "home_pts": 109, "away_pts": 116, "total_pts": 225, "sportsbook_total": 223.5},
-    ]
-    
-    return pd.DataFrame(games)
+    return _FALLBACK_WEEK.copy()
 
 
 def backtest_past_week():
@@ -122,7 +134,11 @@ def backtest_past_week():
     print("BACKTEST: PAST WEEK REAL GAMES")
     print("=" * 70)
     
-    all_games = get_past_week_games()
+    # Fetch the scoreboard while warming the pace cache predict_total reads from
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        games_future = executor.submit(get_past_week_games)
+        executor.submit(get_team_pace_from_espn)
+        all_games = games_future.result()
     
     if all_games is None or len(all_games) == 0:
         print("Failed to fetch games")
@@ -132,79 +148,83 @@ def backtest_past_week():
     
     print(f"\nAnalyzing {len(all_games)} games from past week...\n")
     
-    results = []
+    # Pull columns out once; per-row .iloc boxes a whole Series each time
+    dates = all_games['date'].to_numpy()
+    homes = all_games['home'].to_numpy()
+    aways = all_games['away'].to_numpy()
+    lines = all_games['sportsbook_total'].to_numpy()
+    totals = all_games['total_pts'].to_numpy()
+    
+    predicted_idx = []
+    predictions = []
+    
+    # Models for every expanding training window (all prior games), built in one pass
+    model_snapshots = calculate_team_totals_by_prefix(all_games, range(2, len(all_games)))
     
     for idx in range(len(all_games)):
-        current_game = all_games.iloc[idx]
-        
         # Use all prior games as training data
-        training_data = all_games.iloc[:idx]
+        if idx < 2:
+            continue
+        
+        model_data = model_snapshots[idx]
         
-        if len(training_data) < 2:
+        # Check if both teams in model
+        if aways[idx] not in model_data.index or homes[idx] not in model_data.index:
             continue
         
+        # Predict total; both teams are known, so a failure here is a real error
         try:
-            # Build model from training data
-            model_data = calculate_team_totals(training_data)
-            
-            # Check if both teams in model
-            if current_game['away'] not in model_data.index or current_game['home'] not in model_data.index:
-                continue
-            
-            # Predict total
             predicted = predict_total(
                 model_data,
-                current_game['away'],
-                current_game['home'],
+                aways[idx],
+                homes[idx],
                 total_multiplier=1.05
             )
-            
-            # Calculate edge
-            edge = calculate_edge(predicted, current_game['sportsbook_total'])
-            
-            # Determine result
-            actual_total = current_game['total_pts']
-            predicted_over = predicted > current_game['sportsbook_total']
-            actual_over = actual_total > current_game['sportsbook_total']
-            
-            if predicted_over and actual_over:
-                result = "WIN"
-            elif not predicted_over and not actual_over:
-                result = "WIN"
-            else:
-                result = "LOSS"
-            
-            results.append({
-                "date": current_game['date'],
-                "matchup": f"{current_game['away']} @ {current_game['home']}",
-                "actual": actual_total,
-                "predicted": predicted,
-                "line": current_game['sportsbook_total'],
-                "edge": edge,
-                "bet": "OVER" if predicted_over else "UNDER",
-                "result": result
-            })
-            
-            # Print detailed result
-            print(
-                f"{current_game['date']} | "
-                f"{current_game['away'][:3]} @ {current_game['home'][:3]} | "
-                f"Pred: {predicted:.1f} | "
-                f"Line: {current_game['sportsbook_total']:.1f} | "
-                f"Actual: {actual_total} | "
-                f"Edge: {edge:+.1f} | "
-                f"Bet: {'OVER' if predicted_over else 'UNDER'} | "
-                f"Result: {result}"
-            )
-        
         except Exception as e:
+            print(f"⚠️  Prediction failed for {aways[idx]} @ {homes[idx]}: {e}")
             continue
+        
+        predictions.append(predicted)
+        predicted_idx.append(idx)
     
-    if not results:
+    if not predicted_idx:
         print("No predictions generated")
         return
     
-    results_df = pd.DataFrame(results)
+    # Edge and result for every prediction in one vectorized pass
+    pos = np.array(predicted_idx)
+    predicted = np.array(predictions)
+    line = lines[pos]
+    actual = totals[pos]
+    edge = np.round(predicted - line, 2)
+    predicted_over = predicted > line
+    actual_over = actual > line
+    bet = np.where(predicted_over, "OVER", "UNDER")
+    result = np.where(predicted_over == actual_over, "WIN", "LOSS")
+    
+    results_df = pd.DataFrame({
+        "date": dates[pos],
+        "matchup": [f"{away} @ {home}" for away, home in zip(aways[pos], homes[pos])],
+        "actual": actual,
+        "predicted": predicted,
+        "line": line,
+        "edge": edge,
+        "bet": bet,
+        "result": result
+    })
+    
+    # Print detailed results
+    for i, idx in enumerate(pos):
+        print(
+            f"{dates[idx]} | "
+            f"{aways[idx][:3]} @ {homes[idx][:3]} | "
+            f"Pred: {predicted[i]:.1f} | "
+            f"Line: {line[i]:.1f} | "
+            f"Actual: {actual[i]} | "
+            f"Edge: {edge[i]:+.1f} | "
+            f"Bet: {bet[i]} | "
+            f"Result: {result[i]}"
+        )
     
     # Summary stats
     print("\n" + "=" * 70)
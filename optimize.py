@@ -1,17 +1,18 @@
 """
 Model optimization script - test different parameters to maximize win rate.
 """
+import numpy as np
 import pandas as pd
 from src.backtest import get_historical_games, summarize_backtest
-from src.process import calculate_team_totals, calculate_home_court_advantage
-from src.edge import calculate_edge
+from src.process import cached_team_totals_by_prefix, calculate_home_court_advantage
+from src.edge import score_predictions
 
 
-def predict_total_optimized(model_data, away_team, home_team, 
-                            home_court_bonuses=None, total_multiplier=1.0):
+def _base_prediction(model_data, away_team, home_team, home_court_bonuses=None):
     """
-    Optimized prediction with configurable total multiplier.
-    Multiplier scales the entire prediction (e.g., 1.05 = 5% higher totals).
+    Unscaled prediction: averaged team scoring plus the home court bonus.
+    Everything predict_total_optimized does before applying the multiplier.
+    Returns None if either team is missing from model_data.
     """
     if home_court_bonuses is None:
         home_court_bonuses = {}
@@ -19,11 +20,11 @@ def predict_total_optimized(model_data, away_team, home_team,
     league_avg_scored = 110
     league_avg_allowed = 110
     
-    try:
-        home = model_data.loc[home_team]
-        away = model_data.loc[away_team]
-    except KeyError:
-        raise ValueError(f"Team not found")
+    if home_team not in model_data.index or away_team not in model_data.index:
+        return None
+    
+    home = model_data.loc[home_team]
+    away = model_data.loc[away_team]
     
     home_scored = home.get("avg_scored_home", league_avg_scored) or league_avg_scored
     home_allowed = home.get("avg_allowed_home", league_avg_allowed) or league_avg_allowed
@@ -34,7 +35,50 @@ def predict_total_optimized(model_data, away_team, home_team,
     
     # Apply team-specific home court bonus
     home_bonus = home_court_bonuses.get(home_team, 3.5)
-    pred = pred + home_bonus
+    return pred + home_bonus
+
+
+def _game_stats(model_data, away_team, home_team, home_court_bonuses):
+    """
+    Raw inputs for _predict_batch for one game:
+    (home_scored, home_allowed, away_scored, away_allowed, home_bonus).
+    """
+    home = model_data.loc[home_team]
+    away = model_data.loc[away_team]
+    return (
+        home["avg_scored_home"],
+        home["avg_allowed_home"],
+        away["avg_scored_away"],
+        away["avg_allowed_away"],
+        home_court_bonuses.get(home_team, 3.5),
+    )
+
+
+def _predict_batch(home_scored, home_allowed, away_scored, away_allowed, hc_bonuses, multiplier):
+    """
+    Vectorized predict_total_optimized over aligned per-game arrays.
+    Zero stats (team has no home/away games yet) fall back to league average.
+    """
+    league_avg = 110
+    home_scored = np.where(home_scored == 0, league_avg, home_scored)
+    home_allowed = np.where(home_allowed == 0, league_avg, home_allowed)
+    away_scored = np.where(away_scored == 0, league_avg, away_scored)
+    away_allowed = np.where(away_allowed == 0, league_avg, away_allowed)
+    
+    pred = (home_scored + away_scored + home_allowed + away_allowed) / 2 + hc_bonuses
+    return np.round(pred * multiplier, 1)
+
+
+def predict_total_optimized(model_data, away_team, home_team, 
+                            home_court_bonuses=None, total_multiplier=1.0):
+    """
+    Optimized prediction with configurable total multiplier.
+    Multiplier scales the entire prediction (e.g., 1.05 = 5% higher totals).
+    Returns None if either team is missing from model_data.
+    """
+    pred = _base_prediction(model_data, away_team, home_team, home_court_bonuses)
+    if pred is None:
+        return None
     
     # Apply total multiplier
     pred = pred * total_multiplier
@@ -42,6 +86,18 @@ def predict_total_optimized(model_data, away_team, home_team,
     return round(pred, 1)
 
 
+def _first_seen(all_games):
+    """
+    Index of the first game each team plays (home or away).
+    A team is in the model for game idx exactly when first_seen[team] < idx.
+    """
+    first_seen = {}
+    for i, (home, away) in enumerate(zip(all_games['home'], all_games['away'])):
+        first_seen.setdefault(home, i)
+        first_seen.setdefault(away, i)
+    return first_seen
+
+
 def grid_search_backtest():
     """
     Test different total multipliers to find optimal configuration.
@@ -49,67 +105,60 @@ def grid_search_backtest():
     all_games = get_historical_games(30)
     all_games = all_games.sort_values('date').reset_index(drop=True)
     
-    results_summary = []
-    
     # Test different total multipliers (1.0 = no change, 1.05 = 5% higher, etc.)
-    for multiplier in [0.95, 0.98, 1.0, 1.02, 1.05, 1.08, 1.1]:
-        results = []
+    multipliers = [0.95, 0.98, 1.0, 1.02, 1.05, 1.08, 1.1]
+    game_stats = []
+    lines = []
+    actuals = []
+    
+    # Team totals for every walk-forward prefix, aggregated in one pass
+    model_snapshots = cached_team_totals_by_prefix(all_games, range(4, len(all_games)))
+    first_seen = _first_seen(all_games)
+    
+    for idx in range(4, len(all_games)):
+        current_game = all_games.iloc[idx]
+        
+        if first_seen[current_game['away']] >= idx or first_seen[current_game['home']] >= idx:
+            continue
         
-        for idx in range(len(all_games)):
-            current_game = all_games.iloc[idx]
-            training_data = all_games.iloc[:idx]
-            
-            if len(training_data) < 4:
-                continue
-            
-            try:
-                model_data = calculate_team_totals(training_data, recency_weight=True)
-                
-                if current_game['away'] not in model_data.index or current_game['home'] not in model_data.index:
-                    continue
-                
-                # Get team-specific home court advantages
-                home_court_bonuses = calculate_home_court_advantage(model_data)
-                
-                predicted = predict_total_optimized(
-                    model_data,
-                    current_game['away'],
-                    current_game['home'],
-                    home_court_bonuses=home_court_bonuses,
-                    total_multiplier=multiplier
-                )
-                
-                edge = calculate_edge(predicted, current_game['sportsbook_total'])
-                
-                actual_total = current_game['total_pts']
-                predicted_over = predicted > current_game['sportsbook_total']
-                actual_over = actual_total > current_game['sportsbook_total']
-                
-                if edge != 0:
-                    result = "WIN" if (predicted_over == actual_over) else "LOSS"
-                else:
-                    result = "PUSH"
-                
-                results.append({"result": result, "edge": edge})
-            except:
-                continue
+        # Model and home court bonuses only depend on idx, so gather the
+        # inputs once and score every multiplier against the same arrays
+        model_data = model_snapshots[idx]
         
-        if results:
-            wins = sum(1 for r in results if r["result"] == "WIN")
-            total_bets = sum(1 for r in results if r["result"] != "PUSH")
-            win_rate = wins / total_bets if total_bets > 0 else 0
-            avg_edge = sum(abs(r["edge"]) for r in results) / len(results)
-            
-            results_summary.append({
-                "multiplier": multiplier,
-                "games": len(results),
-                "wins": wins,
-                "total_bets": total_bets,
-                "win_rate": win_rate,
-                "avg_edge": avg_edge
-            })
-    
-    return pd.DataFrame(results_summary)
+        # Get team-specific home court advantages
+        home_court_bonuses = calculate_home_court_advantage(model_data)
+        
+        game_stats.append(_game_stats(
+            model_data,
+            current_game['away'],
+            current_game['home'],
+            home_court_bonuses
+        ))
+        lines.append(current_game['sportsbook_total'])
+        actuals.append(current_game['total_pts'])
+    
+    if not game_stats:
+        return pd.DataFrame()
+    
+    stats = np.array(game_stats, dtype=np.float64).T
+    lines = np.array(lines)
+    actuals = np.array(actuals)
+    
+    # Score every multiplier over every game at once: one row per multiplier
+    predicted = _predict_batch(*stats, np.array(multipliers)[:, None])
+    edge, result, _ = score_predictions(predicted, lines, actuals)
+    wins = np.count_nonzero(result == "WIN", axis=1)
+    total_bets = np.count_nonzero(result != "PUSH", axis=1)
+    win_rate = np.where(total_bets > 0, wins / np.maximum(total_bets, 1), 0.0)
+    
+    return pd.DataFrame({
+        "multiplier": multipliers,
+        "games": len(lines),
+        "wins": wins,
+        "total_bets": total_bets,
+        "win_rate": win_rate,
+        "avg_edge": np.abs(edge).mean(axis=1)
+    })
 
 
 def backtest_optimized(best_multiplier=1.05):
@@ -119,57 +168,52 @@ def backtest_optimized(best_multiplier=1.05):
     all_games = get_historical_games(30)
     all_games = all_games.sort_values('date').reset_index(drop=True)
     
-    results = []
+    predicted_idx = []
+    game_stats = []
+    
+    model_snapshots = cached_team_totals_by_prefix(all_games, range(4, len(all_games)))
+    first_seen = _first_seen(all_games)
     
-    for idx in range(len(all_games)):
+    for idx in range(4, len(all_games)):
         current_game = all_games.iloc[idx]
-        training_data = all_games.iloc[:idx]
         
-        if len(training_data) < 4:
+        if first_seen[current_game['away']] >= idx or first_seen[current_game['home']] >= idx:
             continue
         
-        try:
-            model_data = calculate_team_totals(training_data, recency_weight=True)
-            
-            if current_game['away'] not in model_data.index or current_game['home'] not in model_data.index:
-                continue
-            
-            # Use team-specific home court bonuses
-            home_court_bonuses = calculate_home_court_advantage(model_data)
-            
-            predicted = predict_total_optimized(
-                model_data,
-                current_game['away'],
-                current_game['home'],
-                home_court_bonuses=home_court_bonuses,
-                total_multiplier=best_multiplier
-            )
-            
-            edge = calculate_edge(predicted, current_game['sportsbook_total'])
-            actual_total = current_game['total_pts']
-            predicted_over = predicted > current_game['sportsbook_total']
-            actual_over = actual_total > current_game['sportsbook_total']
-            
-            if edge != 0:
-                result = "WIN" if (predicted_over == actual_over) else "LOSS"
-            else:
-                result = "PUSH"
-            
-            results.append({
-                "date": current_game['date'],
-                "home": current_game['home'],
-                "away": current_game['away'],
-                "actual_total": actual_total,
-                "sportsbook_total": current_game['sportsbook_total'],
-                "predicted_total": predicted,
-                "edge": edge,
-                "bet": "OVER" if predicted_over else "UNDER",
-                "result": result,
-            })
-        except:
-            continue
-    
-    return pd.DataFrame(results)
+        model_data = model_snapshots[idx]
+        
+        # Use team-specific home court bonuses
+        home_court_bonuses = calculate_home_court_advantage(model_data)
+        
+        game_stats.append(_game_stats(
+            model_data,
+            current_game['away'],
+            current_game['home'],
+            home_court_bonuses
+        ))
+        predicted_idx.append(idx)
+    
+    if not predicted_idx:
+        return pd.DataFrame()
+    
+    # Predictions, edge and result for every game in one vectorized pass
+    games = all_games.iloc[predicted_idx]
+    predicted = _predict_batch(*np.array(game_stats, dtype=np.float64).T, best_multiplier)
+    line = games['sportsbook_total'].to_numpy()
+    actual = games['total_pts'].to_numpy()
+    edge, result, _ = score_predictions(predicted, line, actual)
+    
+    return pd.DataFrame({
+        "date": games['date'].to_numpy(),
+        "home": games['home'].to_numpy(),
+        "away": games['away'].to_numpy(),
+        "actual_total": actual,
+        "sportsbook_total": line,
+        "predicted_total": predicted,
+        "edge": edge,
+        "bet": np.where(predicted > line, "OVER", "UNDER"),
+        "result": result,
+    })
 
 
 if __name__ == "__main__":
@@ -5,19 +5,19 @@ Run this with: python schedule_predictions.py
 Or set up as cron: 0 10 * * * cd /path/to/nba-totals-model && python schedule_predictions.py
 """
 
-import schedule
 import time
 import logging
-from datetime import datetime
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from src.data_fetch import get_games
 from src.process import calculate_team_totals
-from src.model import predict_total
-from src.edge import calculate_edge
+from src.model import predict_slate
 from src.odds_fetch import get_nba_games_with_odds
-from src.injury import adjust_prediction_for_injuries
-from src.advanced_stats import get_pace_adjusted_total
-from src.streaks import calculate_streak_adjustment
-from src.line_movement import should_filter_based_on_movement
+from src.injury import adjust_prediction_for_injuries, get_team_injuries
+from src.advanced_stats import get_team_pace_from_espn
+from src.streaks import get_team_records
+from src.edge import edge_and_filter
 
 # Configure logging
 logging.basicConfig(
@@ -31,6 +31,26 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def fetch_slate_inputs(sportsbook="draftkings"):
+    """
+    Fetch every live input for today's slate concurrently.
+    
+    The scoreboard, odds, pace, injury and standings endpoints are
+    independent, so one thread each turns five serial round-trips into a
+    single wait.
+    
+    Returns:
+        Tuple: (games_df, odds_games, pace_map, injuries_map, records)
+    """
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        games = pool.submit(get_games)
+        odds = pool.submit(get_nba_games_with_odds, sportsbook=sportsbook)
+        pace = pool.submit(get_team_pace_from_espn)
+        injuries = pool.submit(get_team_injuries)
+        records = pool.submit(get_team_records)
+        return games.result(), odds.result(), pace.result(), injuries.result(), records.result()
+
+
 def run_predictions():
     """
     Fetch today's games and generate predictions using live sportsbook odds.
@@ -40,18 +60,15 @@ def run_predictions():
     logger.info("=" * 60)
     
     try:
-        # Fetch games
-        df = get_games()
+        # Fetch games, live sportsbook odds, pace, injuries and standings in parallel
+        logger.info("Fetching games, odds (The Odds API), pace, injuries and standings...")
+        df, odds_games, pace_map, injuries_map, records = fetch_slate_inputs(sportsbook="draftkings")
         logger.info(f"Found {len(df)} games today")
         
         if len(df) == 0:
             logger.info("No games found.")
             return
         
-        # Fetch live sportsbook odds
-        logger.info("Fetching live sportsbook odds from The Odds API...")
-        odds_games = get_nba_games_with_odds(sportsbook="draftkings")
-        
         # Build odds lookup
         odds_map = {}
         for game in odds_games:
@@ -74,68 +91,46 @@ def run_predictions():
         # Build model
         model_data = calculate_team_totals(df_completed)
         
-        # Generate predictions
+        # Base, pace and streak for the whole slate in one vectorized pass;
+        # a team missing from the model skips that game
+        slate = predict_slate(model_data, df_completed[['away', 'home']], pace_map=pace_map, records=records)
+        for away, home in df_completed[['away', 'home']].drop(slate.index).itertuples(index=False):
+            logger.error(f"Error predicting {home} vs {away}: team not found in model data")
+        aways = slate['away'].tolist()
+        homes = slate['home'].tolist()
+        
+        # Live sportsbook lines
+        sportsbooks = np.array([odds_map.get((away.lower(), home.lower()), 220.0)
+                                for away, home in zip(aways, homes)])
+        
+        # Enhancements: 1. Advanced stats (pace) and 3. Streaks come with the
+        # slate, 2. Injuries are added on top
+        base_preds = slate['base_total'].to_numpy()
+        pace_adjs = slate['pace_adj'].to_numpy()
+        streak_adjs = slate['streak_adj'].to_numpy()
+        injury_adjs = np.array([adjust_prediction_for_injuries(away, home, injuries_map)
+                                for away, home in zip(aways, homes)])
+        predicted = slate['predicted_total'].to_numpy() + injury_adjs
+        
+        # Edge and 4. line movement filter
+        edges, should_bet = edge_and_filter(predicted, sportsbooks)
+        bets = np.select([~should_bet, edges > 0, edges < 0], ["FILTERED", "OVER", "UNDER"], default="PASS")
+        
         predictions = []
-        for idx, row in df_completed.iterrows():
-            try:
-                away = row['away']
-                home = row['home']
-                
-                # Get live sportsbook line
-                key = (away.lower(), home.lower())
-                sportsbook = odds_map.get(key, 220.0)
-                
-                # Base prediction
-                predicted = predict_total(model_data, away, home)
-                logger.info(f"\n{away} @ {home}:")
-                logger.info(f"  Base: {predicted}")
-                
-                # Apply enhancements
-                # 1. Advanced stats (pace adjustment)
-                pace_adj = get_pace_adjusted_total(predicted, away, home)
-                if pace_adj != 0:
-                    predicted += pace_adj
-                    logger.info(f"  Pace: {pace_adj:+.1f} → {predicted}")
-                
-                # 2. Injury adjustment
-                injury_adj = adjust_prediction_for_injuries(away, home)
-                if injury_adj != 0:
-                    predicted += injury_adj
-                    logger.info(f"  Injury: {injury_adj:+.1f} → {predicted}")
-                
-                # 3. Streak adjustment
-                streak_adj = calculate_streak_adjustment(home, away)
-                if streak_adj != 0:
-                    predicted += streak_adj
-                    logger.info(f"  Streak: {streak_adj:+.1f} → {predicted}")
-                
-                # Calculate edge
-                edge = calculate_edge(predicted, sportsbook)
-                
-                # 4. Line movement filter
-                should_bet = should_filter_based_on_movement(predicted, sportsbook, "OVER" if edge > 0 else "UNDER")
-                
-                bet = "OVER" if edge > 0 else "UNDER" if edge < 0 else "PASS"
-                if not should_bet:
-                    bet = "FILTERED"
-                
-                prediction = {
-                    "home": home,
-                    "away": away,
-                    "predicted": predicted,
-                    "sportsbook": sportsbook,
-                    "edge": edge,
-                    "bet": bet
-                }
-                predictions.append(prediction)
-                
-                logger.info(
-                    f"  Final: Pred {predicted:.1f} vs Book {sportsbook} | "
-                    f"Edge: {edge:+.1f} ({bet})"
-                )
-            except Exception as e:
-                logger.error(f"Error predicting {home} vs {away}: {e}")
-                continue
+        for i in range(len(aways)):
+            logger.info(
+                f"{aways[i]} @ {homes[i]}: Base {base_preds[i]} | "
+                f"Pace {pace_adjs[i]:+.1f} | Injury {injury_adjs[i]:+.1f} | Streak {streak_adjs[i]:+.1f} | "
+                f"Pred {predicted[i]:.1f} vs Book {sportsbooks[i]} | Edge: {edges[i]:+.1f} ({bets[i]})"
+            )
+            predictions.append({
+                "home": homes[i],
+                "away": aways[i],
+                "predicted": float(predicted[i]),
+                "sportsbook": float(sportsbooks[i]),
+                "edge": float(edges[i]),
+                "bet": str(bets[i])
+            })
         
         # Summary
         logger.info("-" * 60)
@@ -147,16 +142,22 @@ def run_predictions():
         logger.error(f"Error in run_predictions: {e}", exc_info=True)
 
 
-def schedule_daily():
+def schedule_daily(hour=10, minute=0):
     """
-    Schedule predictions to run daily at 10 AM.
+    Schedule predictions to run daily at hour:minute (10 AM by default).
+    
+    Sleeps straight through to the next run time instead of polling.
     """
     logger.info("Scheduler started")
-    schedule.every().day.at("10:00").do(run_predictions)
     
     while True:
-        schedule.run_pending()
-        time.sleep(60)
+        now = datetime.now()
+        target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target <= now:
+            target += timedelta(days=1)
+        logger.info(f"Next run at {target:%Y-%m-%d %H:%M}")
+        time.sleep((target - now).total_seconds())
+        run_predictions()
 
 
 if __name__ == "__main__":
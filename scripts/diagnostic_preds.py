@@ -9,13 +9,12 @@ if ROOT not in sys.path:
 
 from backtest_1000_fast import generate_1000_games_fast, np
 import pandas as pd
-from src.process import calculate_team_totals
+from src.process import cached_team_totals_by_prefix
 from src.model import predict_total
 from src.advanced_stats import get_team_pace_from_espn, get_pace_adjusted_total
 from src.injury import adjust_prediction_for_injuries, get_team_injuries
-from src.streaks import calculate_streak_adjustment
-from src.line_movement import should_filter_based_on_movement
-from src.edge import calculate_edge
+from src.streaks import calculate_streak_adjustment, get_team_records
+from src.edge import edge_and_filter
 
 
 def diagnostic(n=30):
@@ -24,15 +23,18 @@ def diagnostic(n=30):
 
     pace_map = get_team_pace_from_espn()
     injuries_map = get_team_injuries()
+    records = get_team_records()
+
+    # Sample points increase monotonically, so every model comes out of one
+    # running scan over the games instead of a rebuild per sample
+    model_snapshots = cached_team_totals_by_prefix(all_games, sample_indices)
 
     rows = []
     for idx in sample_indices:
-        game = all_games[idx]
-        training = all_games[:idx]
-        if len(training) < 10:
+        game = all_games.iloc[idx]
+        if idx < 10:
             continue
-        df = pd.DataFrame(training)
-        model_data = calculate_team_totals(df)
+        model_data = model_snapshots[idx]
         if game['away'] not in model_data.index or game['home'] not in model_data.index:
             continue
 
@@ -56,7 +58,7 @@ def diagnostic(n=30):
         pace_adj = get_pace_adjusted_total(base_pred, game['away'], game['home'], pace_map)
 
         # streak adj
-        streak_adj = calculate_streak_adjustment(game['home'], game['away'])
+        streak_adj = calculate_streak_adjustment(game['home'], game['away'], records)
 
         # injury adj
         injury_adj = adjust_prediction_for_injuries(game['away'], game['home'], injuries_map)
@@ -70,8 +72,7 @@ def diagnostic(n=30):
         pred_direct_plus_injury = round(pred_direct + injury_adj, 1)
 
         sportsbook = game['sportsbook_total']
-        edge = calculate_edge(recomposed, sportsbook)
-        should_bet = should_filter_based_on_movement(recomposed, sportsbook, 'OVER' if edge>0 else 'UNDER')
+        edge, should_bet = edge_and_filter(recomposed, sportsbook)
 
         rows.append({
             'idx': idx,
@@ -1,79 +1,83 @@
 #!/usr/bin/env python3
-"""Run multiple sampled backtests and aggregate results.
+"""Run a sampled backtest and bootstrap confidence intervals for its results.
 """
 import numpy as np
 import pandas as pd
 from backtest_1000_fast import generate_1000_games_fast
-from src.process import calculate_team_totals
+from src.process import cached_team_totals_by_prefix
 from src.model import predict_total
 from src.advanced_stats import get_team_pace_from_espn
 from src.injury import adjust_prediction_for_injuries, get_team_injuries
 from src.streaks import calculate_streak_adjustment
-from src.line_movement import should_filter_based_on_movement
-from src.edge import calculate_edge
+from src.edge import score_predictions
 
 
-def run_sample_run(sample_size=200, seed=42):
-    np.random.seed(seed)
-    all_games = generate_1000_games_fast()
+def run_sample_run(sample_size=200, seed=42, all_games=None, injuries_map=None):
+    rng = np.random.default_rng(seed)
+    if all_games is None:
+        all_games = generate_1000_games_fast()
     # sample indices from later portion to ensure training size
-    indices = np.random.choice(range(100, 1000), size=sample_size, replace=False)
+    indices = rng.choice(np.arange(100, 1000), size=sample_size, replace=False)
 
     pace_map = get_team_pace_from_espn()
-    injuries_map = get_team_injuries()
-
-    results = []
+    if injuries_map is None:
+        injuries_map = get_team_injuries()
+
+    # Team totals for every sampled prefix, aggregated in one pass
+    model_snapshots = cached_team_totals_by_prefix(all_games, indices)
+
+    # Columnar result buffers, filled by position and trimmed after the loop
+    n = len(indices)
+    homes = np.empty(n, dtype=object)
+    aways = np.empty(n, dtype=object)
+    predicted = np.empty(n, dtype=np.float64)
+    actual = np.empty(n, dtype=np.int16)
+    sportsbook = np.empty(n, dtype=np.float32)
+    k = 0
     for idx in indices:
-        current_game = all_games[idx]
-        training_games = all_games[:idx]
-        if len(training_games) < 10:
+        current_game = all_games.iloc[idx]
+        if idx < 10:
             continue
-        try:
-            training_df = pd.DataFrame(training_games)
-            model_data = calculate_team_totals(training_df)
-            if current_game['away'] not in model_data.index or current_game['home'] not in model_data.index:
-                continue
-
-            predicted = predict_total(model_data, current_game['away'], current_game['home'], total_multiplier=1.05)
-            # Only apply injury adj here (predict_total includes pace/streak)
-            injury_adj = adjust_prediction_for_injuries(current_game['away'], current_game['home'], injuries_map)
-            predicted += injury_adj
-
-            edge = calculate_edge(predicted, current_game['sportsbook_total'])
-            should_bet = should_filter_based_on_movement(predicted, current_game['sportsbook_total'], 'OVER' if edge>0 else 'UNDER')
-
-            actual_total = current_game['total_pts']
-            predicted_over = predicted > current_game['sportsbook_total']
-            actual_over = actual_total > current_game['sportsbook_total']
-
-            if edge != 0:
-                result = "WIN" if (predicted_over and actual_over) or (not predicted_over and not actual_over) else "LOSS"
-            else:
-                result = "PUSH"
-
-            results.append({
-                'home': current_game['home'],
-                'away': current_game['away'],
-                'predicted': predicted,
-                'actual': actual_total,
-                'sportsbook': current_game['sportsbook_total'],
-                'edge': edge,
-                'result': result,
-                'filtered': not should_bet,
-            })
-        except Exception:
+        model_data = model_snapshots[idx]
+        if current_game['away'] not in model_data.index or current_game['home'] not in model_data.index:
             continue
 
-    df = pd.DataFrame(results)
-    df_bets = df[df['filtered'] == False]
-    wins = len(df_bets[df_bets['result'] == 'WIN'])
-    losses = len(df_bets[df_bets['result'] == 'LOSS'])
-    pushes = len(df_bets[df_bets['result'] == 'PUSH'])
-    bet_games = len(df_bets)
-    total_games = len(df)
+        prediction = predict_total(model_data, current_game['away'], current_game['home'], total_multiplier=1.05)
+        # Only apply injury adj here (predict_total includes pace/streak)
+        prediction += adjust_prediction_for_injuries(current_game['away'], current_game['home'], injuries_map)
+
+        homes[k] = current_game['home']
+        aways[k] = current_game['away']
+        predicted[k] = prediction
+        actual[k] = current_game['total_pts']
+        sportsbook[k] = current_game['sportsbook_total']
+        k += 1
+
+    # Edge, filter and outcome for every sampled game in one vectorized pass
+    predicted, actual, sportsbook = predicted[:k], actual[:k], sportsbook[:k]
+    edge, result, should_bet = score_predictions(predicted, sportsbook, actual)
+
+    df = pd.DataFrame({
+        'home': homes[:k],
+        'away': aways[:k],
+        'predicted': predicted,
+        'actual': actual,
+        'sportsbook': sportsbook,
+        'edge': edge,
+        'result': result,
+        'filtered': ~should_bet,
+    }, copy=False)
+
+    bet_result = result[should_bet]
+    bet_edge = edge[should_bet]
+    wins = int(np.count_nonzero(bet_result == 'WIN'))
+    losses = int(np.count_nonzero(bet_result == 'LOSS'))
+    pushes = int(np.count_nonzero(bet_result == 'PUSH'))
+    bet_games = len(bet_result)
+    total_games = k
     win_rate = wins / (wins + losses) if (wins + losses) > 0 else 0.0
-    avg_edge = df_bets['edge'].abs().mean() if bet_games > 0 else 0.0
-    total_edge = df_bets['edge'].sum() if bet_games > 0 else 0.0
+    avg_edge = np.abs(bet_edge).mean() if bet_games > 0 else 0.0
+    total_edge = bet_edge.sum() if bet_games > 0 else 0.0
 
     metrics = {
         'total_games': total_games,
@@ -89,43 +93,54 @@ def run_sample_run(sample_size=200, seed=42):
     return metrics, df
 
 
+def bootstrap_ci(values, stat=np.mean, n_resamples=10000, confidence=0.95, seed=None):
+    """
+    Percentile bootstrap confidence interval for a statistic of one sample.
+
+    Args:
+        values: 1-D array of per-game observations
+        stat: Reduction applied along axis 1 of the resample matrix
+        n_resamples: Number of bootstrap resamples
+        confidence: Interval coverage (0.95 = 95% CI)
+        seed: Seed for the resampling Generator
+
+    Returns:
+        Tuple: (low, high), or (nan, nan) for an empty sample
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return (np.nan, np.nan)
+    rng = np.random.default_rng(seed)
+    resamples = values[rng.integers(0, len(values), size=(n_resamples, len(values)))]
+    estimates = stat(resamples, axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(estimates, [tail, 100 - tail])
+    return (low, high)
+
+
 if __name__ == '__main__':
-    ITER = 10
-    SAMPLE_SIZE = 200
+    SAMPLE_SIZE = 900
+    N_RESAMPLES = 10000
     base_seed = 1000
 
-    all_metrics = []
-    dfs = []
-    for i in range(ITER):
-        seed = base_seed + i
-        print(f"Running sample {i+1}/{ITER} (seed={seed})")
-        metrics, df = run_sample_run(sample_size=SAMPLE_SIZE, seed=seed)
-        all_metrics.append(metrics)
-        dfs.append(df)
-        print(f"  bets: {metrics['bets_placed']}, wins: {metrics['wins']}, win_rate: {metrics['win_rate']:.3f}, avg_edge: {metrics['avg_edge']:.2f}")
-
-    mdf = pd.DataFrame(all_metrics)
-    summary = {
-        'mean_win_rate': mdf['win_rate'].mean(),
-        'std_win_rate': mdf['win_rate'].std(),
-        'mean_avg_edge': mdf['avg_edge'].mean(),
-        'std_avg_edge': mdf['avg_edge'].std(),
-        'mean_bets': mdf['bets_placed'].mean()
-    }
+    # One backtest over every eligible game, then bootstrap the game-level
+    # outcomes for the CI instead of re-running seeded sub-samples
+    print(f"Running sampled backtest (sample size={SAMPLE_SIZE}, seed={base_seed})")
+    metrics, df = run_sample_run(sample_size=SAMPLE_SIZE, seed=base_seed)
+    print(f"  bets: {metrics['bets_placed']}, wins: {metrics['wins']}, win_rate: {metrics['win_rate']:.3f}, avg_edge: {metrics['avg_edge']:.2f}")
 
-    # 95% CI approximate
-    n = len(mdf)
-    win_ci = (summary['mean_win_rate'] - 1.96 * summary['std_win_rate'] / np.sqrt(n), summary['mean_win_rate'] + 1.96 * summary['std_win_rate'] / np.sqrt(n))
-    edge_ci = (summary['mean_avg_edge'] - 1.96 * summary['std_avg_edge'] / np.sqrt(n), summary['mean_avg_edge'] + 1.96 * summary['std_avg_edge'] / np.sqrt(n))
+    bets = df[~df['filtered']]
+    decided = bets[bets['result'] != 'PUSH']
+    win_ci = bootstrap_ci((decided['result'] == 'WIN').to_numpy(), n_resamples=N_RESAMPLES, seed=base_seed)
+    edge_ci = bootstrap_ci(bets['edge'].abs().to_numpy(), n_resamples=N_RESAMPLES, seed=base_seed)
 
     print('\nAGGREGATED RESULTS')
-    print('Runs:', ITER, 'Sample size per run:', SAMPLE_SIZE)
-    print(f"Mean win rate: {summary['mean_win_rate']:.3f} (95% CI: {win_ci[0]:.3f} - {win_ci[1]:.3f})")
-    print(f"Mean avg edge: {summary['mean_avg_edge']:.2f} (95% CI: {edge_ci[0]:.2f} - {edge_ci[1]:.2f})")
-    print(f"Mean bets placed per run: {summary['mean_bets']:.1f}")
+    print('Games:', metrics['total_games'], 'Bootstrap resamples:', N_RESAMPLES)
+    print(f"Win rate: {metrics['win_rate']:.3f} (95% CI: {win_ci[0]:.3f} - {win_ci[1]:.3f})")
+    print(f"Avg edge: {metrics['avg_edge']:.2f} (95% CI: {edge_ci[0]:.2f} - {edge_ci[1]:.2f})")
+    print(f"Bets placed: {metrics['bets_placed']}")
 
     # save detailed results
-    out = pd.concat(dfs, ignore_index=True)
-    out.to_csv('sampled_aggregated_results.csv', index=False)
-    pd.DataFrame(all_metrics).to_csv('sampled_aggregated_metrics.csv', index=False)
+    df.to_csv('sampled_aggregated_results.csv', index=False)
+    pd.DataFrame([metrics]).to_csv('sampled_aggregated_metrics.csv', index=False)
     print('\nSaved sampled_aggregated_results.csv and sampled_aggregated_metrics.csv')
@@ -1,12 +1,74 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from src.process import calculate_team_totals
-from src.model import predict_total
-from src.edge import calculate_edge
-from src.advanced_stats import get_pace_adjusted_total
-from src.injury import adjust_prediction_for_injuries
-from src.streaks import calculate_streak_adjustment
-from src.line_movement import should_filter_based_on_movement
+from functools import partial
+from src.process import pregame_team_stats
+from src.model import make_predictor
+from src.edge import score_predictions
+from src.advanced_stats import get_pace_adjustments, get_team_pace_from_espn
+from src.injury import adjust_prediction_for_injuries, get_team_injuries
+from src.streaks import calculate_streak_adjustment, get_team_records
+
+
+# Historical games stored column-wise with fixed dtypes, built once at import
+# instead of on every call. Mixed results - balanced over/unders to avoid overfitting.
+_HISTORICAL_GAMES_DF = pd.DataFrame({
+    "date": [
+        "2025-11-30", "2025-11-30", "2025-11-30", "2025-11-30",
+        "2025-11-29", "2025-11-29", "2025-11-29", "2025-11-29",
+        "2025-11-28", "2025-11-28", "2025-11-28", "2025-11-28",
+        "2025-11-27", "2025-11-27", "2025-11-27", "2025-11-27",
+        "2025-11-26", "2025-11-26", "2025-11-26", "2025-11-26",
+        "2025-11-25", "2025-11-25", "2025-11-25", "2025-11-25",
+        "2025-11-24", "2025-11-24", "2025-11-24", "2025-11-24",
+        "2025-11-23", "2025-11-23", "2025-11-23"
+    ],
+    "home": [
+        "Boston Celtics", "Golden State Warriors", "Denver Nuggets", "Milwaukee Bucks",
+        "Boston Celtics", "Denver Nuggets", "Miami Heat", "Phoenix Suns",
+        "Miami Heat", "Los Angeles Lakers", "Milwaukee Bucks", "Golden State Warriors",
+        "Phoenix Suns", "Boston Celtics", "Los Angeles Lakers", "Denver Nuggets",
+        "Golden State Warriors", "Miami Heat", "Memphis Grizzlies", "Chicago Bulls",
+        "New York Knicks", "Phoenix Suns", "Los Angeles Lakers", "Miami Heat",
+        "Denver Nuggets", "Golden State Warriors", "Los Angeles Lakers", "Milwaukee Bucks",
+        "Boston Celtics", "New York Knicks", "Phoenix Suns"
+    ],
+    "away": [
+        "Miami Heat", "Los Angeles Lakers", "Phoenix Suns", "Chicago Bulls",
+        "Los Angeles Lakers", "Golden State Warriors", "New York Knicks", "Memphis Grizzlies",
+        "Denver Nuggets", "Boston Celtics", "Phoenix Suns", "Denver Nuggets",
+        "Miami Heat", "Milwaukee Bucks", "New York Knicks", "Chicago Bulls",
+        "Phoenix Suns", "Boston Celtics", "Los Angeles Lakers", "Denver Nuggets",
+        "Boston Celtics", "Golden State Warriors", "Denver Nuggets", "Milwaukee Bucks",
+        "Boston Celtics", "Miami Heat", "Phoenix Suns", "Chicago Bulls",
+        "Denver Nuggets", "Golden State Warriors", "Los Angeles Lakers"
+    ],
+    "home_pts": np.array([
+        117, 112, 110, 118, 111, 115, 106, 114, 104, 116, 108, 113, 119, 109, 117, 105,
+        114, 103, 118, 108, 110, 118, 102, 102, 113, 116, 115, 112, 107, 112, 118
+    ], dtype=np.int16),
+    "away_pts": np.array([
+        108, 106, 108, 104, 109, 111, 110, 109, 112, 119, 107, 115, 107, 111, 115, 103,
+        110, 109, 116, 114, 105, 112, 100, 108, 111, 103, 117, 101, 115, 117, 116
+    ], dtype=np.int16),
+    "total_pts": np.array([
+        225, 218, 218, 222, 220, 226, 216, 223, 216, 235, 215, 228, 226, 220, 232, 208,
+        224, 212, 234, 222, 215, 230, 202, 210, 224, 219, 232, 213, 222, 229, 234
+    ], dtype=np.int16),
+    "sportsbook_total": np.array([
+        224.5, 222.5, 219.0, 220.0, 221.0, 223.5, 216.5, 221.0,
+        220.5, 233.0, 225.5, 226.0, 224.0, 219.5, 229.5, 219.5,
+        222.0, 217.0, 231.0, 219.0, 219.5, 227.5, 221.0, 215.5,
+        224.0, 217.0, 229.0, 224.5, 220.5, 226.5, 232.0
+    ], dtype=np.float32),
+})
+
+# Team names share one categorical dtype (small integer codes instead of
+# Python strings); outcome labels get fixed categories as well
+_TEAM_DTYPE = pd.CategoricalDtype(sorted(set(_HISTORICAL_GAMES_DF["home"]) | set(_HISTORICAL_GAMES_DF["away"])))
+_HISTORICAL_GAMES_DF = _HISTORICAL_GAMES_DF.astype({"home": _TEAM_DTYPE, "away": _TEAM_DTYPE})
+_RESULT_DTYPE = pd.CategoricalDtype(["WIN", "LOSS", "PUSH"])
+_BET_DTYPE = pd.CategoricalDtype(["OVER", "UNDER", "FILTERED", "PASS"])
 
 
 def get_historical_games(days_back=30):
@@ -15,165 +77,96 @@ def get_historical_games(days_back=30):
     Sportsbook lines are calibrated correctly, not inflated.
     Totals range 206-248 (realistic 2024-25 NBA range).
     """
-    historical_data = [
-        # Mixed results - balanced over/unders to avoid overfitting
-        {"date": "2025-11-30", "home": "Boston Celtics", "away": "Miami Heat", 
-         "home_pts": 117, "away_pts": 108, "total_pts": 225, "sportsbook_total": 224.5},  # OVER
-        {"date": "2025-11-30", "home": "Golden State Warriors", "away": "Los Angeles Lakers", 
-         "home_pts": 112, "away_pts": 106, "total_pts": 218, "sportsbook_total": 222.5},  # UNDER
-        {"date": "2025-11-30", "home": "Denver Nuggets", "away": "Phoenix Suns", 
-         "home_pts": 110, "away_pts": 108, "total_pts": 218, "sportsbook_total": 219.0},  # UNDER
-        {"date": "2025-11-30", "home": "Milwaukee Bucks", "away": "Chicago Bulls", 
-         "home_pts": 118, "away_pts": 104, "total_pts": 222, "sportsbook_total": 220.0},  # OVER
-        {"date": "2025-11-29", "home": "Boston Celtics", "away": "Los Angeles Lakers", 
-         "home_pts": 111, "away_pts": 109, "total_pts": 220, "sportsbook_total": 221.0},  # UNDER
-        {"date": "2025-11-29", "home": "Denver Nuggets", "away": "Golden State Warriors", 
-         "home_pts": 115, "away_pts": 111, "total_pts": 226, "sportsbook_total": 223.5},  # OVER
-        {"date": "2025-11-29", "home": "Miami Heat", "away": "New York Knicks", 
-         "home_pts": 106, "away_pts": 110, "total_pts": 216, "sportsbook_total": 216.5},  # UNDER
-        {"date": "2025-11-29", "home": "Phoenix Suns", "away": "Memphis Grizzlies", 
-         "home_pts": 114, "away_pts": 109, "total_pts": 223, "sportsbook_total": 221.0},  # OVER
-        {"date": "2025-11-28", "home": "Miami Heat", "away": "Denver Nuggets", 
-         "home_pts": 104, "away_pts": 112, "total_pts": 216, "sportsbook_total": 220.5},  # UNDER
-        {"date": "2025-11-28", "home": "Los Angeles Lakers", "away": "Boston Celtics", 
-         "home_pts": 116, "away_pts": 119, "total_pts": 235, "sportsbook_total": 233.0},  # OVER
-        {"date": "2025-11-28", "home": "Milwaukee Bucks", "away": "Phoenix Suns", 
-         "home_pts": 108, "away_pts": 107, "total_pts": 215, "sportsbook_total": 225.5},  # UNDER
-        {"date": "2025-11-28", "home": "Golden State Warriors", "away": "Denver Nuggets", 
-         "home_pts": 113, "away_pts": 115, "total_pts": 228, "sportsbook_total": 226.0},  # OVER
-        {"date": "2025-11-27", "home": "Phoenix Suns", "away": "Miami Heat", 
-         "home_pts": 119, "away_pts": 107, "total_pts": 226, "sportsbook_total": 224.0},  # OVER
-        {"date": "2025-11-27", "home": "Boston Celtics", "away": "Milwaukee Bucks", 
-         "home_pts": 109, "away_pts": 111, "total_pts": 220, "sportsbook_total": 219.5},  # OVER
-        {"date": "2025-11-27", "home": "Los Angeles Lakers", "away": "New York Knicks", 
-         "home_pts": 117, "away_pts": 115, "total_pts": 232, "sportsbook_total": 229.5},  # OVER
-        {"date": "2025-11-27", "home": "Denver Nuggets", "away": "Chicago Bulls", 
-         "home_pts": 105, "away_pts": 103, "total_pts": 208, "sportsbook_total": 219.5},  # UNDER
-        {"date": "2025-11-26", "home": "Golden State Warriors", "away": "Phoenix Suns", 
-         "home_pts": 114, "away_pts": 110, "total_pts": 224, "sportsbook_total": 222.0},  # OVER
-        {"date": "2025-11-26", "home": "Miami Heat", "away": "Boston Celtics", 
-         "home_pts": 103, "away_pts": 109, "total_pts": 212, "sportsbook_total": 217.0},  # UNDER
-        {"date": "2025-11-26", "home": "Memphis Grizzlies", "away": "Los Angeles Lakers", 
-         "home_pts": 118, "away_pts": 116, "total_pts": 234, "sportsbook_total": 231.0},  # OVER
-        {"date": "2025-11-26", "home": "Chicago Bulls", "away": "Denver Nuggets", 
-         "home_pts": 108, "away_pts": 114, "total_pts": 222, "sportsbook_total": 219.0},  # OVER
-        {"date": "2025-11-25", "home": "New York Knicks", "away": "Boston Celtics", 
-         "home_pts": 110, "away_pts": 105, "total_pts": 215, "sportsbook_total": 219.5},  # UNDER
-        {"date": "2025-11-25", "home": "Phoenix Suns", "away": "Golden State Warriors", 
-         "home_pts": 118, "away_pts": 112, "total_pts": 230, "sportsbook_total": 227.5},  # OVER
-        {"date": "2025-11-25", "home": "Los Angeles Lakers", "away": "Denver Nuggets", 
-         "home_pts": 102, "away_pts": 100, "total_pts": 202, "sportsbook_total": 221.0},  # UNDER
-        {"date": "2025-11-25", "home": "Miami Heat", "away": "Milwaukee Bucks", 
-         "home_pts": 102, "away_pts": 108, "total_pts": 210, "sportsbook_total": 215.5},  # UNDER
-        {"date": "2025-11-24", "home": "Denver Nuggets", "away": "Boston Celtics", 
-         "home_pts": 113, "away_pts": 111, "total_pts": 224, "sportsbook_total": 224.0},  # OVER
-        {"date": "2025-11-24", "home": "Golden State Warriors", "away": "Miami Heat", 
-         "home_pts": 116, "away_pts": 103, "total_pts": 219, "sportsbook_total": 217.0},  # OVER
-        {"date": "2025-11-24", "home": "Los Angeles Lakers", "away": "Phoenix Suns", 
-         "home_pts": 115, "away_pts": 117, "total_pts": 232, "sportsbook_total": 229.0},  # OVER
-        {"date": "2025-11-24", "home": "Milwaukee Bucks", "away": "Chicago Bulls", 
-         "home_pts": 112, "away_pts": 101, "total_pts": 213, "sportsbook_total": 224.5},  # UNDER
-        {"date": "2025-11-23", "home": "Boston Celtics", "away": "Denver Nuggets", 
-         "home_pts": 107, "away_pts": 115, "total_pts": 222, "sportsbook_total": 220.5},  # OVER
-        {"date": "2025-11-23", "home": "New York Knicks", "away": "Golden State Warriors", 
-         "home_pts": 112, "away_pts": 117, "total_pts": 229, "sportsbook_total": 226.5},  # OVER
-        {"date": "2025-11-23", "home": "Phoenix Suns", "away": "Los Angeles Lakers", 
-         "home_pts": 118, "away_pts": 116, "total_pts": 234, "sportsbook_total": 232.0},  # OVER
-    ]
-    
-    return pd.DataFrame(historical_data)
+    return _HISTORICAL_GAMES_DF.copy()
+
 
+def _game_adjustments(home_team, away_team, injuries_map, records):
+    """Injury and streak adjustments for one game: (injury_adj, streak_adj)."""
+    return (
+        adjust_prediction_for_injuries(away_team, home_team, injuries_map),
+        calculate_streak_adjustment(home_team, away_team, records)
+    )
 
-def backtest_model(days_back=30, lookback_window=10):
+
+def backtest_model(days_back=30, lookback_window=10, pace_map=None, injuries_map=None, records=None):
     """
     Backtest the model on historical data.
     
     Args:
         days_back: How many days of historical data to use
         lookback_window: Training window (days of data used to predict each game)
+        pace_map: Pre-fetched {team: pace} map (fetched once here if None)
+        injuries_map: Pre-fetched {team: [injuries]} map (fetched once here if None)
+        records: Pre-fetched {team: record} standings map (fetched once here if None)
     
     Returns:
         DataFrame with predictions, actuals, and performance metrics
     """
     all_games = get_historical_games(days_back)
-    results = []
+    
+    # Fetch external maps once per backtest instead of once per game
+    if pace_map is None:
+        pace_map = get_team_pace_from_espn()
+    if injuries_map is None:
+        injuries_map = get_team_injuries()
+    if records is None:
+        records = get_team_records()
     
     # Sort by date
     all_games = all_games.sort_values('date').reset_index(drop=True)
     
-    for idx in range(len(all_games)):
-        current_game = all_games.iloc[idx]
-        
-        # Use all games before this one as training data (not limited by lookback window)
-        training_data = all_games.iloc[:idx]
-        
-        if len(training_data) < 4:
-            continue
-        
-        try:
-            # Build model from training data
-            model_data = calculate_team_totals(training_data)
-            
-            # Check if both teams exist in model data
-            if current_game['away'] not in model_data.index or current_game['home'] not in model_data.index:
-                continue
-            
-            # Predict this game's total with fixed parameters (proven optimal)
-            predicted = predict_total(
-                model_data, 
-                current_game['away'], 
-                current_game['home'],
-                total_multiplier=1.05
-            )
-            
-            # Apply 4 enhancements
-            pace_adj = get_pace_adjusted_total(predicted, current_game['away'], current_game['home'])
-            predicted += pace_adj
-            
-            injury_adj = adjust_prediction_for_injuries(current_game['away'], current_game['home'])
-            predicted += injury_adj
-            
-            streak_adj = calculate_streak_adjustment(current_game['home'], current_game['away'])
-            predicted += streak_adj
-            
-            # Calculate edge and filter
-            edge = calculate_edge(predicted, current_game['sportsbook_total'])
-            should_bet = should_filter_based_on_movement(predicted, current_game['sportsbook_total'], 
-                                                         "OVER" if edge > 0 else "UNDER")
-            
-            # Determine if prediction was correct
-            actual_total = current_game['total_pts']
-            predicted_over = predicted > current_game['sportsbook_total']
-            actual_over = actual_total > current_game['sportsbook_total']
-            correct = predicted_over == actual_over
-            
-            # Win/loss for betting
-            if edge != 0:
-                if predicted_over and actual_over:
-                    result = "WIN"
-                elif not predicted_over and not actual_over:
-                    result = "WIN"
-                else:
-                    result = "LOSS"
-            else:
-                result = "PUSH"
-            
-            results.append({
-                "date": current_game['date'],
-                "home": current_game['home'],
-                "away": current_game['away'],
-                "actual_total": actual_total,
-                "sportsbook_total": current_game['sportsbook_total'],
-                "predicted_total": predicted,
-                "edge": edge,
-                "bet": "OVER" if predicted_over else "UNDER",
-                "result": result,
-                "training_games": len(training_data)
-            })
-        except Exception as e:
-            continue
-    
-    return pd.DataFrame(results)
+    # Every game's pregame team averages (all games before it as training
+    # data, not limited by lookback window), computed in one pass
+    stats = pregame_team_stats(all_games)
+    
+    # Need 4+ training games and both teams already in the model
+    eligible = (np.arange(len(all_games)) >= 4) & stats['known'].to_numpy()
+    games = all_games[eligible]
+    stats = stats[eligible]
+    if games.empty:
+        return pd.DataFrame()
+    
+    home = games['home'].to_numpy()
+    away = games['away'].to_numpy()
+    line = games['sportsbook_total'].to_numpy(dtype=np.float64)
+    actual = games['total_pts'].to_numpy()
+    
+    # predict_total's base formula with fixed parameters (proven optimal):
+    # zero averages fall back to league average, default 3.5pt home bonus
+    league_avg = 110
+    home_scored, home_allowed, away_scored, away_allowed = (
+        stats[col].where(stats[col] != 0, league_avg).to_numpy()
+        for col in ('home_scored', 'home_allowed', 'away_scored', 'away_allowed')
+    )
+    base = make_predictor(3.5, 1.05)(home_scored, home_allowed, away_scored, away_allowed)
+    
+    # Injury and streak lookups are in-memory reads against the prefetched
+    # maps, so a plain serial pass is cheapest
+    score_game = partial(_game_adjustments, injuries_map=injuries_map, records=records)
+    adjustments = list(map(score_game, home, away))
+    injury_adj, streak_adj = np.array(adjustments, dtype=np.float64).T
+    
+    # Pace and streak enhancements, applied once as predict_total does
+    predicted = np.round(base + get_pace_adjustments(away, home, pace_map) + streak_adj, 1)
+    
+    # Injuries are the one enhancement predict_total leaves to the caller
+    predicted = predicted + injury_adj
+    
+    # Edge and win/loss for betting
+    edge, result, _ = score_predictions(predicted, line, actual)
+    
+    return pd.DataFrame({
+        "date": games['date'].to_numpy(),
+        "home": games['home'].array,
+        "away": games['away'].array,
+        "actual_total": actual,
+        "sportsbook_total": line,
+        "predicted_total": predicted,
+        "edge": edge,
+        "bet": pd.Categorical(np.where(predicted > line, "OVER", "UNDER"), dtype=_BET_DTYPE),
+        "result": pd.Categorical(result, dtype=_RESULT_DTYPE),
+        "training_games": games.index.to_numpy()
+    })
 
 
 def summarize_backtest(results_df):
@@ -184,10 +177,12 @@ def summarize_backtest(results_df):
         print("No results to summarize")
         return
     
-    total_bets = len(results_df[results_df['result'] != 'PUSH'])
-    wins = len(results_df[results_df['result'] == 'WIN'])
-    losses = len(results_df[results_df['result'] == 'LOSS'])
-    pushes = len(results_df[results_df['result'] == 'PUSH'])
+    # One pass over the result column for every outcome count
+    counts = results_df['result'].value_counts()
+    wins = int(counts.get('WIN', 0))
+    losses = int(counts.get('LOSS', 0))
+    pushes = int(counts.get('PUSH', 0))
+    total_bets = len(results_df) - pushes
     
     win_rate = wins / total_bets if total_bets > 0 else 0
     avg_edge = results_df['edge'].abs().mean()
@@ -1,6 +1,9 @@
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from src.jsonutil import loads
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0"
@@ -9,14 +12,19 @@ HEADERS = {
 SCOREBOARD_URL = "https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json"
 BOXSCORE_URL = "https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{}.json"
 
+# Pooled session so boxscore fetches share keep-alive connections to the CDN
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
 
 def get_game_ids():
     """
     Fetch today's NBA game IDs from free NBA scoreboard.
     """
     try:
-        r = requests.get(SCOREBOARD_URL, headers=HEADERS, timeout=5)
-        data = r.json()
+        r = _SESSION.get(SCOREBOARD_URL, timeout=5)
+        data = loads(r.content)
         game_ids = []
         games = data.get("scoreboard", {}).get("games", [])
         for game in games:
@@ -31,10 +39,9 @@ def get_boxscore(game_id):
     Pull free NBA boxscore stats for one game.
     """
     try:
-        url = f"https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{game_id}.json"
-        r = requests.get(url, headers=HEADERS, timeout=5)
+        r = _SESSION.get(BOXSCORE_URL.format(game_id), timeout=5)
         if r.status_code == 200:
-            return r.json()
+            return loads(r.content)
     except:
         pass
     return None
@@ -47,8 +54,11 @@ def get_advanced_stats():
     ids = get_game_ids()
     rows = []
 
-    for gid in ids:
-        box = get_boxscore(gid)
+    # Boxscores are independent requests; fetch them concurrently
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        boxes = list(executor.map(get_boxscore, ids))
+
+    for gid, box in zip(ids, boxes):
         if not box:
             continue
 
@@ -82,8 +92,8 @@ def get_games(date=None):
     Returns DataFrame with columns: date, home, away, home_pts, away_pts, total_pts
     """
     try:
-        r = requests.get(SCOREBOARD_URL, headers=HEADERS, timeout=5)
-        data = r.json()
+        r = _SESSION.get(SCOREBOARD_URL, timeout=5)
+        data = loads(r.content)
         games = data.get("scoreboard", {}).get("games", [])
         
         rows = []
@@ -1,6 +1,47 @@
+import numpy as np
+
+from src.line_movement import MAX_DISCREPANCY
+
+
 def calculate_edge(predicted_total, sportsbook_total):
     """
     If our model total is higher/lower than the book,
     we calculate the edge.
     """
     return round(predicted_total - sportsbook_total, 2)
+
+
+def edge_and_filter(predicted_total, sportsbook_total):
+    """
+    Edge and line movement filter from a single subtraction.
+    Works on scalars or elementwise on NumPy arrays.
+    
+    Returns:
+        Tuple: (edge rounded to 2 decimals, should_bet)
+    """
+    diff = predicted_total - sportsbook_total
+    edge = np.round(diff, 2) if isinstance(diff, np.ndarray) else round(diff, 2)
+    return edge, abs(diff) <= MAX_DISCREPANCY
+
+
+def score_predictions(predicted, sportsbook, actual):
+    """
+    Edge, bet filter and outcome for a batch of games in one vectorized pass.
+    
+    Args:
+        predicted: Array of model totals
+        sportsbook: Array of sportsbook lines
+        actual: Array of final game totals
+    
+    Returns:
+        Tuple: (edges, results, should_bet) where results holds
+        "WIN"/"LOSS"/"PUSH" and should_bet is the line movement filter mask
+    """
+    predicted = np.asarray(predicted, dtype=np.float64)
+    sportsbook = np.asarray(sportsbook, dtype=np.float64)
+    actual = np.asarray(actual)
+    
+    edges, should_bet = edge_and_filter(predicted, sportsbook)
+    results = np.where((predicted > sportsbook) == (actual > sportsbook), "WIN", "LOSS").astype(object)
+    results[edges == 0] = "PUSH"
+    return edges, results, should_bet
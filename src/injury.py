@@ -8,41 +8,74 @@ This module attempts multiple sources in order:
 The returned structure is a mapping {team_name: ["Player Name (status)", ...]}.
 """
 
+import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List
 import time
-import json
 import os
+import tempfile
 from pathlib import Path
+from src.jsonutil import dumps, loads
+
+# Pooled session so refreshes reuse the ESPN connection. One retry, for read
+# errors only: worst case ~2 x 5 s per request before falling back to the cache
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_maxsize=4, max_retries=Retry(total=1, connect=0, backoff_factor=0.5)))
 
 # In-memory cache
 _INJURY_CACHE = None
 _INJURY_CACHE_TS = 0
 _INJURY_CACHE_TTL = 3600  # 1 hour
+# Per-team impacts precomputed for the current _INJURY_CACHE: (injuries map, {team: impact})
+_INJURY_IMPACT_CACHE = (None, {})
 
 # Disk cache location
 _CACHE_DIR = Path('.cache')
 _CACHE_DIR.mkdir(parents=True, exist_ok=True)
 _CACHE_FILE = _CACHE_DIR / 'injuries.json'
 
+SUPERSTARS = {
+    "Luka Doncic": 10, "LeBron James": 10, "Giannis Antetokounmpo": 10,
+    "Kevin Durant": 9, "Jayson Tatum": 8, "Stephen Curry": 9,
+    "Shai Gilgeous-Alexander": 8, "Joel Embiid": 10, "Damian Lillard": 8,
+    "Kawhi Leonard": 8, "Jimmy Butler": 7, "Anthony Davis": 9,
+}
 
-def _load_disk_cache() -> Dict:
+# Lowercased lookup table and one pattern matching any superstar name
+_STAR_IMPACT = {star.lower(): impact for star, impact in SUPERSTARS.items()}
+_STAR_RE = re.compile("|".join(re.escape(star) for star in _STAR_IMPACT))
+
+
+def _read_disk_payload() -> Dict:
+    """Raw disk cache payload, whatever its age ({} if missing or unreadable)."""
     try:
         if not _CACHE_FILE.exists():
             return {}
-        payload = json.loads(_CACHE_FILE.read_text())
-        ts = payload.get('ts', 0)
-        if time.time() - ts > _INJURY_CACHE_TTL:
-            return {}
-        return payload.get('injuries', {})
+        raw = _CACHE_FILE.read_bytes()
+        return loads(raw)
     except Exception:
         return {}
 
 
-def _write_disk_cache(injuries: Dict):
+def _load_disk_cache() -> Dict:
+    payload = _read_disk_payload()
+    ts = payload.get('ts', 0)
+    if time.time() - ts > _INJURY_CACHE_TTL:
+        return {}
+    return payload.get('injuries', {})
+
+
+def _write_disk_cache(injuries: Dict, etag: str = None, last_modified: str = None):
     try:
-        payload = {'ts': time.time(), 'injuries': injuries}
-        _CACHE_FILE.write_text(json.dumps(payload))
+        payload = {'ts': time.time(), 'etag': etag, 'last_modified': last_modified, 'injuries': injuries}
+        data = dumps(payload)
+        # Write to a temp file and swap it in so readers never see a torn file;
+        # the name is unique so concurrent writers never share a temp file
+        with tempfile.NamedTemporaryFile(dir=_CACHE_FILE.parent, suffix='.tmp', delete=False) as tmp:
+            tmp.write(data)
+        os.replace(tmp.name, _CACHE_FILE)
     except Exception:
         pass
 
@@ -51,7 +84,7 @@ def get_team_injuries() -> Dict[str, List[str]]:
     """
     Get injuries map. Uses in-memory + disk cache and falls back to ESPN endpoints.
     """
-    global _INJURY_CACHE, _INJURY_CACHE_TS
+    global _INJURY_CACHE, _INJURY_CACHE_TS, _INJURY_IMPACT_CACHE
 
     # In-memory cache
     if _INJURY_CACHE is not None and (time.time() - _INJURY_CACHE_TS) < _INJURY_CACHE_TTL:
@@ -62,41 +95,67 @@ def get_team_injuries() -> Dict[str, List[str]]:
     if disk:
         _INJURY_CACHE = disk
         _INJURY_CACHE_TS = time.time()
+        _INJURY_IMPACT_CACHE = (disk, precompute_impacts(disk))
         return _INJURY_CACHE
 
+    # Expired disk copy: revalidate it with a conditional GET instead of refetching
+    stale = _read_disk_payload()
+    validators = {}
+    if stale.get('etag'):
+        validators['If-None-Match'] = stale['etag']
+    if stale.get('last_modified'):
+        validators['If-Modified-Since'] = stale['last_modified']
+
+    url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/teams"
+    sb_url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
+
     injuries = {}
+    etag = last_modified = None
+    not_modified = False
     try:
-        url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/teams"
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
-
-        # The structure can be nested; try multiple safe access patterns
-        for item in data.get('teams', []) or []:
-            # team object may be under 'team' key
-            team_obj = item.get('team') if isinstance(item, dict) and item.get('team') else item
-            team_name = team_obj.get('displayName') or team_obj.get('name') or team_obj.get('location')
-            if not team_name:
-                continue
-            injured = []
-            for inj in item.get('injuries', []) or []:
-                # inj might be dict with displayName/status
-                name = inj.get('displayName') or inj.get('player', {}).get('displayName') or ''
-                status = inj.get('status') or inj.get('description') or ''
-                label = f"{name} ({status})".strip()
-                if name:
-                    injured.append(label)
-
-            injuries[team_name] = injured
+        resp = _SESSION.get(url, headers=validators, timeout=5)
+        if resp.status_code == 304:
+            # Unchanged upstream: reuse the cached map, no body to download or parse
+            not_modified = True
+            injuries = stale.get('injuries', {})
+            etag, last_modified = stale.get('etag'), stale.get('last_modified')
+        else:
+            resp.raise_for_status()
+            etag = resp.headers.get('ETag')
+            last_modified = resp.headers.get('Last-Modified')
+            data = loads(resp.content)
+
+            # The structure can be nested; try multiple safe access patterns
+            for item in data.get('teams', []) or []:
+                # team object may be under 'team' key
+                team_obj = item.get('team') if isinstance(item, dict) and item.get('team') else item
+                team_name = team_obj.get('displayName') or team_obj.get('name') or team_obj.get('location')
+                if not team_name:
+                    continue
+                injured = []
+                for inj in item.get('injuries', []) or []:
+                    # inj might be dict with displayName/status
+                    name = inj.get('displayName') or inj.get('player', {}).get('displayName') or ''
+                    status = inj.get('status') or inj.get('description') or ''
+                    label = f"{name} ({status})".strip()
+                    if name:
+                        injured.append(label)
+
+                injuries[team_name] = injured
 
     except Exception:
         injuries = {}
+        etag = last_modified = None
 
     # If teams endpoint didn't provide many injuries, try scoreboard events
-    if len(injuries) <= 5:
+    if not not_modified and len(injuries) <= 5:
+        # The validators only vouch for the teams payload; a map with
+        # scoreboard entries must be fully refetched next time
+        etag = last_modified = None
         try:
-            sb_url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
-            sb = requests.get(sb_url, timeout=5).json()
+            # Only requested when it will be read: not on a 304 or a rich teams payload
+            sb_resp = _SESSION.get(sb_url, timeout=5)
+            sb = loads(sb_resp.content)
             for event in sb.get('events', []) or []:
                 comps = event.get('competitions') or []
                 if not comps:
@@ -131,8 +190,9 @@ def get_team_injuries() -> Dict[str, List[str]]:
     # save to caches
     _INJURY_CACHE = injuries
     _INJURY_CACHE_TS = time.time()
+    _INJURY_IMPACT_CACHE = (injuries, precompute_impacts(injuries))
     try:
-        _write_disk_cache(injuries)
+        _write_disk_cache(injuries, etag, last_modified)
     except Exception:
         pass
 
@@ -148,27 +208,17 @@ def calculate_injury_impact(team_name: str, injuries_dict: Dict[str, List[str]])
     if not injured:
         return 0.0
 
-    SUPERSTARS = {
-        "Luka Doncic": 10, "LeBron James": 10, "Giannis Antetokounmpo": 10,
-        "Kevin Durant": 9, "Jayson Tatum": 8, "Stephen Curry": 9,
-        "Shai Gilgeous-Alexander": 8, "Joel Embiid": 10, "Damian Lillard": 8,
-        "Kawhi Leonard": 8, "Jimmy Butler": 7, "Anthony Davis": 9,
-    }
-
     superstar_total = 0.0
     superstar_count = 0
     role_count = 0
 
     for entry in injured:
         name = entry.split('(')[0].strip()
-        matched = False
-        for star, impact in SUPERSTARS.items():
-            if star.lower() in name.lower():
-                superstar_total += impact
-                superstar_count += 1
-                matched = True
-                break
-        if not matched:
+        match = _STAR_RE.search(name.lower())
+        if match:
+            superstar_total += _STAR_IMPACT[match.group(0)]
+            superstar_count += 1
+        else:
             role_count += 1
 
     role_impact = role_count * 1.5
@@ -180,6 +230,14 @@ def calculate_injury_impact(team_name: str, injuries_dict: Dict[str, List[str]])
     return min(total, 15.0)
 
 
+def precompute_impacts(injuries_dict: Dict[str, List[str]]) -> Dict[str, float]:
+    """
+    calculate_injury_impact for every team in an injuries map, in one pass.
+    Teams missing from the result have no injuries (impact 0.0).
+    """
+    return {team: calculate_injury_impact(team, injuries_dict) for team in injuries_dict}
+
+
 def adjust_prediction_for_injuries(away_team: str, home_team: str, injuries_map=None) -> float:
     """
     Return the additive injury adjustment to the model prediction (negative reduces total).
@@ -189,8 +247,14 @@ def adjust_prediction_for_injuries(away_team: str, home_team: str, injuries_map=
     else:
         injuries = injuries_map or {}
 
-    home_impact = calculate_injury_impact(home_team, injuries)
-    away_impact = calculate_injury_impact(away_team, injuries)
+    cached_map, impacts = _INJURY_IMPACT_CACHE
+    if injuries is cached_map:
+        # Same map as the module cache: impacts were computed when it loaded
+        home_impact = impacts.get(home_team, 0.0)
+        away_impact = impacts.get(away_team, 0.0)
+    else:
+        home_impact = calculate_injury_impact(home_team, injuries)
+        away_impact = calculate_injury_impact(away_team, injuries)
 
     # average of both teams' lost points reduces the game total
     return - (home_impact + away_impact) / 2.0
@@ -0,0 +1,21 @@
+"""
+JSON encode/decode shared by the fetch and cache modules.
+Uses orjson when it is installed and the standard library otherwise.
+"""
+
+import json
+
+try:
+    import orjson  # optional: faster encode/decode
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """Decode JSON from bytes or str (a response body or cache file)."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def dumps(obj) -> bytes:
+    """Encode obj as UTF-8 JSON bytes."""
+    return orjson.dumps(obj) if orjson else json.dumps(obj).encode()
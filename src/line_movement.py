@@ -7,6 +7,9 @@ Otherwise: proceed with model prediction.
 
 from typing import Dict, Tuple
 
+# Model vs market gap (points) beyond which the market is trusted
+MAX_DISCREPANCY = 12.0
+
 
 def calculate_line_movement(default_line: float, current_line: float) -> Tuple[float, str]:
     """
@@ -34,6 +37,8 @@ def should_filter_based_on_movement(predicted_total: float, sportsbook_total: fl
     Filter bets if going heavily against market (>12pts difference = suspicious).
     Conservative: only filter extreme outliers.
     
+    Works elementwise when given NumPy arrays.
+    
     Args:
         predicted_total: Model prediction
         sportsbook_total: Sportsbook line
@@ -46,10 +51,7 @@ def should_filter_based_on_movement(predicted_total: float, sportsbook_total: fl
     discrepancy = abs(predicted_total - sportsbook_total)
     
     # Only filter if difference > 12 points (extreme outlier)
-    if discrepancy > 12.0:
-        return False
-    
-    return True
+    return discrepancy <= MAX_DISCREPANCY
 
 
 def apply_line_movement_filter(prediction_data: Dict) -> Dict:
@@ -1,6 +1,9 @@
-from datetime import datetime, timedelta
-from src.advanced_stats import get_pace_adjusted_total
-from src.streaks import calculate_streak_adjustment
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from src.advanced_stats import get_pace_adjusted_total, get_pace_adjustments
+from src.streaks import calculate_streak_adjustment, get_team_records
 from src.injury import adjust_prediction_for_injuries
 
 
@@ -17,17 +20,14 @@ def is_back_to_back(game_date, recent_games, team_name):
         True if back-to-back, False otherwise
     """
     try:
-        current = datetime.fromisoformat(game_date.replace('Z', '+00:00'))
-        yesterday = current - timedelta(days=1)
+        yesterday = (pd.Timestamp(game_date) - pd.Timedelta(days=1)).date()
         
-        for _, game in recent_games.iterrows():
-            game_dt = datetime.fromisoformat(game['date'].replace('Z', '+00:00'))
-            
-            # Check if team played within 24 hours
-            if abs((game_dt - current).days) < 1:
-                if game_dt.date() == yesterday.date():
-                    if team_name in [game.get('home'), game.get('away')]:
-                        return True
+        # One vectorized parse and mask instead of a per-game Python loop
+        dates = pd.to_datetime(recent_games['date']).dt.date.to_numpy()
+        homes = recent_games['home'].to_numpy()
+        aways = recent_games['away'].to_numpy()
+        
+        return bool(((dates == yesterday) & ((homes == team_name) | (aways == team_name))).any())
     except:
         pass
     
@@ -35,6 +35,185 @@ def is_back_to_back(game_date, recent_games, team_name):
     
 
 
+# Model columns the prediction formula reads
+_STAT_COLUMNS = frozenset(["avg_scored_home", "avg_allowed_home", "avg_scored_away", "avg_allowed_away"])
+
+
+def _predict_kernel(home_scored, home_allowed, away_scored, away_allowed, hc_bonus, total_multiplier, market_calibration):
+    """Base prediction arithmetic on aligned per-game arrays."""
+    pred = (home_scored + away_scored + home_allowed + away_allowed) / 2
+    return (pred + hc_bonus) * total_multiplier + market_calibration
+
+
+def make_predictor(hc_bonus=3.5, total_multiplier=1.05, market_calibration=0.0):
+    """
+    Base prediction formula with fixed constants bound.
+    
+    Args:
+        hc_bonus: Home court bonus (points)
+        total_multiplier: Scale factor for total
+        market_calibration: Adjustment for sportsbook bias
+    
+    Returns:
+        Function (home_scored, home_allowed, away_scored, away_allowed) -> unrounded
+        base total, for scalars or aligned arrays
+    """
+    return partial(_predict_kernel, hc_bonus=hc_bonus, total_multiplier=total_multiplier,
+                   market_calibration=market_calibration)
+
+
+def _base_totals(model_data, away_teams, home_teams, home_court_bonuses, total_multiplier, market_calibration):
+    """
+    Unrounded base predictions (before back-to-back, pace and streak) for
+    aligned lists of away and home teams.
+    """
+    # League average fallback (~110 points per team per game)
+    league_avg = 110
+    
+    # Plain team -> row dict and (teams x metrics) float array: positional
+    # reads instead of a hashed .loc lookup and Series per team
+    team_row = {team: i for i, team in enumerate(model_data.index)}
+    column_pos = {column: j for j, column in enumerate(model_data.columns)}
+    values = model_data.to_numpy(dtype=np.float64)
+    
+    missing = [team for team in (*home_teams, *away_teams) if team not in team_row]
+    if missing:
+        raise ValueError(f"Team not found in model data: {missing}")
+    home_rows = [team_row[team] for team in home_teams]
+    away_rows = [team_row[team] for team in away_teams]
+    
+    def stat(column, rows):
+        if column not in column_pos:
+            return np.full(len(rows), league_avg, dtype=np.float64)
+        stat_values = values[rows, column_pos[column]]
+        # Teams without home (or away) games have zeros: use league average
+        return np.where(stat_values == 0, league_avg, stat_values)
+    
+    # Team-specific home court advantage bonus (or default 3.5pt)
+    if home_court_bonuses:
+        hc_bonus = np.array([home_court_bonuses.get(team, 3.5) for team in home_teams], dtype=np.float64)
+    else:
+        hc_bonus = 3.5
+    
+    return _predict_kernel(
+        stat("avg_scored_home", home_rows),
+        stat("avg_allowed_home", home_rows),
+        stat("avg_scored_away", away_rows),
+        stat("avg_allowed_away", away_rows),
+        hc_bonus,
+        total_multiplier,
+        market_calibration
+    )
+
+
+def predict_total_batch(model_data, away_teams, home_teams, home_court_bonuses=None, total_multiplier=1.05, market_calibration=0.0, pace_map=None, records=None):
+    """
+    Predict totals for many games against one model at once.
+    
+    Same formula as predict_total, including pace and streak adjustments,
+    but team stats are pulled out as arrays once instead of a .loc per game.
+    Back-to-back detection is not applied.
+    
+    Args:
+        model_data: DataFrame indexed by team with efficiency metrics
+        away_teams: Sequence of away team names
+        home_teams: Sequence of home team names, aligned with away_teams
+        home_court_bonuses: Dict {team: bonus_pts} for team-specific advantages (default None)
+        total_multiplier: Scale factor for total (default 1.05 = +5%)
+        market_calibration: Adjustment for sportsbook bias (default 0.0 = no adjustment)
+        pace_map: Pre-fetched {team: pace} map (fetched if None)
+        records: Pre-fetched standings for the streak adjustment (fetched once if None)
+    
+    Returns:
+        Array of predicted totals (rounded to 1 decimal)
+    """
+    base, pace_adj, streak_adj = _adjusted_components(
+        model_data, list(away_teams), list(home_teams), home_court_bonuses,
+        total_multiplier, market_calibration, pace_map, records
+    )
+    return np.round(base + pace_adj + streak_adj, 1)
+
+
+def _adjusted_components(model_data, away_teams, home_teams, home_court_bonuses, total_multiplier, market_calibration, pace_map, records):
+    """Unrounded base totals plus pace and streak adjustments, as aligned arrays."""
+    base = _base_totals(model_data, away_teams, home_teams, home_court_bonuses, total_multiplier, market_calibration)
+    pace_adj = get_pace_adjustments(away_teams, home_teams, pace_map)
+    if records is None:
+        records = get_team_records()
+    streak_adj = np.array([calculate_streak_adjustment(h, a, records) for h, a in zip(home_teams, away_teams)],
+                          dtype=np.float64)
+    return base, pace_adj, streak_adj
+
+
+def predict_slate(model_data, slate, home_court_bonuses=None, total_multiplier=1.05, market_calibration=0.0, pace_map=None, records=None):
+    """
+    Predict a whole slate of games in one vectorized pass.
+    
+    Same formula as predict_total_batch, but takes and returns a DataFrame
+    so callers get every component alongside the prediction. Games with a
+    team missing from model_data are dropped instead of raising.
+    
+    Args:
+        model_data: DataFrame indexed by team with efficiency metrics
+        slate: DataFrame with away and home columns (other columns are kept)
+        home_court_bonuses: Dict {team: bonus_pts} for team-specific advantages (default None)
+        total_multiplier: Scale factor for total (default 1.05 = +5%)
+        market_calibration: Adjustment for sportsbook bias (default 0.0 = no adjustment)
+        pace_map: Pre-fetched {team: pace} map (fetched if None)
+        records: Pre-fetched standings for the streak adjustment (fetched once if None)
+    
+    Returns:
+        The known games of slate with base_total, pace_adj, streak_adj and
+        predicted_total (rounded to 1 decimal) columns added
+    """
+    known = slate["home"].isin(model_data.index) & slate["away"].isin(model_data.index)
+    games = slate[known.to_numpy()]
+    base, pace_adj, streak_adj = _adjusted_components(
+        model_data, games["away"].tolist(), games["home"].tolist(), home_court_bonuses,
+        total_multiplier, market_calibration, pace_map, records
+    )
+    return games.assign(
+        base_total=np.round(base, 1),
+        pace_adj=pace_adj,
+        streak_adj=streak_adj,
+        predicted_total=np.round(base + pace_adj + streak_adj, 1)
+    )
+
+
+def _predict_total_simple(model_data, away_team, home_team, total_multiplier):
+    """
+    predict_total with default home court bonus, no market calibration and
+    no recent games: base formula, pace and streak only.
+    """
+    try:
+        home_row = model_data.index.get_loc(home_team)
+        away_row = model_data.index.get_loc(away_team)
+    except KeyError as e:
+        raise ValueError(f"Team not found in model data: {e}")
+    
+    # A view, not a copy, for the all-float team table
+    values = model_data.to_numpy(dtype=np.float64, copy=False)
+    get_col = model_data.columns.get_loc
+    
+    def stat(column, row):
+        value = values[row, get_col(column)]
+        # League average fallback (~110 points per team per game)
+        return value if value != 0 else np.float64(110)
+    
+    pred = _predict_kernel(
+        stat("avg_scored_home", home_row),
+        stat("avg_allowed_home", home_row),
+        stat("avg_scored_away", away_row),
+        stat("avg_allowed_away", away_row),
+        3.5,
+        total_multiplier,
+        0.0
+    )
+    pred = pred + get_pace_adjusted_total(pred, away_team, home_team)
+    pred = pred + calculate_streak_adjustment(home_team, away_team)
+    return round(pred, 1)
+
+
 def predict_total(model_data, away_team, home_team, home_court_bonuses=None, total_multiplier=1.05, market_calibration=0.0, recent_games=None):
     """
     Predict NBA total with team-specific home court advantage and total scaling.
@@ -56,43 +235,15 @@ def predict_total(model_data, away_team, home_team, home_court_bonuses=None, tot
     Returns:
         Predicted total (float, rounded to 1 decimal)
     """
-    # League average fallback (~110 points per team per game)
-    league_avg_scored = 110
-    league_avg_allowed = 110
-    
-    try:
-        home = model_data.loc[home_team]
-        away = model_data.loc[away_team]
-    except KeyError as e:
-        raise ValueError(f"Team not found in model data: {e}")
-    
-    # Use fillna with league average
-    home_scored = home.get("avg_scored_home", league_avg_scored) or league_avg_scored
-    home_allowed = home.get("avg_allowed_home", league_avg_allowed) or league_avg_allowed
-    away_scored = away.get("avg_scored_away", league_avg_scored) or league_avg_scored
-    away_allowed = away.get("avg_allowed_away", league_avg_allowed) or league_avg_allowed
-    
-    # Base prediction
-    pred = (
-        home_scored +
-        away_scored +
-        home_allowed +
-        away_allowed
-    ) / 2
-    
-    # Add team-specific home court advantage bonus (or default 3.5pt)
-    if home_court_bonuses and home_team in home_court_bonuses:
-        hc_bonus = home_court_bonuses[home_team]
-    else:
-        hc_bonus = 3.5
-    
-    pred = pred + hc_bonus
-    
-    # Apply total multiplier
-    pred = pred * total_multiplier
+    # Common call from backtests and the scheduler: skip the optional branches
+    if (home_court_bonuses is None and market_calibration == 0.0 and recent_games is None
+            and _STAT_COLUMNS.issubset(model_data.columns)):
+        return _predict_total_simple(model_data, away_team, home_team, total_multiplier)
     
-    # Apply market calibration (sportsbook bias adjustment)
-    pred = pred + market_calibration
+    pred = _base_totals(
+        model_data, [away_team], [home_team],
+        home_court_bonuses, total_multiplier, market_calibration
+    )[0]
     
     # Back-to-back adjustment: teams score ~2pts less on B2B
     if recent_games is not None and len(recent_games) > 0:
@@ -115,8 +266,6 @@ def predict_total(model_data, away_team, home_team, home_court_bonuses=None, tot
     
     # Apply team streak adjustment (hot teams score more)
     streak_adj = calculate_streak_adjustment(home_team, away_team)
-    if streak_adj != 0:
-        print(f"Streak adjustment: {streak_adj:+.1f}pts")
     pred = pred + streak_adj
 
     return round(pred, 1)
@@ -6,9 +6,13 @@ Sign up: https://theosdsapi.com
 Get API key from: https://theosdsapi.com/account
 """
 
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from src.jsonutil import loads
 
 
 # The Odds API endpoint
@@ -16,6 +20,64 @@ ODDS_API_BASE = "https://api.the-odds-api.com/v4"
 # Sport ID for NBA
 NBA_SPORT = "basketball_nba"
 
+# Canonical team names; our model expects these exact formats
+NBA_TEAMS = [
+    "Atlanta Hawks", "Boston Celtics", "Brooklyn Nets", "Charlotte Hornets",
+    "Chicago Bulls", "Cleveland Cavaliers", "Dallas Mavericks", "Denver Nuggets",
+    "Detroit Pistons", "Golden State Warriors", "Houston Rockets", "Indiana Pacers",
+    "Los Angeles Clippers", "Los Angeles Lakers", "Memphis Grizzlies", "Miami Heat",
+    "Milwaukee Bucks", "Minnesota Timberwolves", "New Orleans Pelicans", "New York Knicks",
+    "Oklahoma City Thunder", "Orlando Magic", "Philadelphia 76ers", "Phoenix Suns",
+    "Portland Trail Blazers", "Sacramento Kings", "San Antonio Spurs", "Toronto Raptors",
+    "Utah Jazz", "Washington Wizards",
+]
+
+
+def _build_team_aliases():
+    """
+    Lowercased full name, nickname ("lakers", "trail blazers") and known
+    variants -> canonical name.
+    """
+    aliases = {}
+    for team in NBA_TEAMS:
+        nickname = "Trail Blazers" if team.endswith("Trail Blazers") else team.rsplit(" ", 1)[1]
+        aliases[team.lower()] = team
+        aliases[nickname.lower()] = team
+    aliases.update({
+        "la clippers": "Los Angeles Clippers",
+        "la lakers": "Los Angeles Lakers",
+        "sixers": "Philadelphia 76ers",
+        "blazers": "Portland Trail Blazers",
+    })
+    return aliases
+
+
+# Built once at import so normalize_team_name is a single dict lookup
+_TEAM_ALIASES = _build_team_aliases()
+
+# Shared session so repeated lookups reuse pooled keep-alive connections;
+# compressed responses keep each quota-limited call small on the wire
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "nba-totals-model", "Accept-Encoding": "gzip, deflate"})
+# Transient 429/5xx responses are retried with exponential backoff (honoring
+# Retry-After) before a request falls back to default odds
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(
+    total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"], respect_retry_after_header=True))
+_SESSION.mount('http://', _ADAPTER)
+_SESSION.mount('https://', _ADAPTER)
+
+
+# In-memory cache of successful odds fetches:
+# {(api_key, sportsbook, regions): (timestamp, games, {(home, away): total})}
+_ODDS_CACHE = {}
+_ODDS_CACHE_TTL = 3600  # seconds
+
+
+def close_session():
+    """Close pooled connections held by the module session."""
+    _SESSION.close()
+
 
 def get_odds_api_key():
     """
@@ -49,23 +111,38 @@ def get_nba_games_with_odds(sportsbook="draftkings", regions="us"):
             'sportsbook': 'draftkings'
         }, ...]
     """
+    return _get_odds_entry(sportsbook, regions)[0]
+
+
+def _get_odds_entry(sportsbook, regions):
+    """
+    Games list plus its _build_total_index lookup.
+    Successful fetches are cached per API key, sportsbook and region for
+    _ODDS_CACHE_TTL seconds so repeated lookups skip the network.
+    """
     api_key = get_odds_api_key()
     if not api_key:
-        return get_fallback_odds()
+        return _with_lookup(get_fallback_odds())
+    
+    key = (api_key, sportsbook.lower(), regions)
+    cached = _ODDS_CACHE.get(key)
+    if cached is not None and time.time() - cached[0] < _ODDS_CACHE_TTL:
+        return cached[1:]
     
     try:
         url = f"{ODDS_API_BASE}/sports/{NBA_SPORT}/odds"
         params = {
             "apiKey": api_key,
             "regions": regions,
+            "bookmakers": sportsbook.lower(),  # Only the book we read, not every book
             "markets": "totals",  # Get over/under totals
             "oddsFormat": "decimal"
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = _SESSION.get(url, params=params, timeout=10)
         response.raise_for_status()
         
-        games = response.json()
+        games = loads(response.content)
         
         # Parse games to extract totals
         result = []
@@ -105,11 +182,29 @@ def get_nba_games_with_odds(sportsbook="draftkings", regions="us"):
                 })
         
         print(f"✓ Fetched {len(result)} games with {sportsbook} odds")
-        return result
+        entry = _with_lookup(result)
+        _ODDS_CACHE[key] = (time.time(), *entry)
+        return entry
     
     except Exception as e:
         print(f"⚠️  Odds API error: {e}")
-        return get_fallback_odds()
+        return _with_lookup(get_fallback_odds())
+
+
+def _with_lookup(games):
+    """Pair a games list with its _build_total_index lookup."""
+    return games, _build_total_index(games)
+
+
+def _build_total_index(games):
+    """
+    {(home, away): total} for a games list, names lowercased once here so
+    lookups are a single dict get. The first listing of a matchup wins.
+    """
+    index = {}
+    for game in games:
+        index.setdefault((game["home"].lower(), game["away"].lower()), game["total"])
+    return index
 
 
 def get_fallback_odds():
@@ -139,11 +234,11 @@ def get_fallback_odds():
 def normalize_team_name(name: str) -> str:
     """
     Normalize team name from API to standard format.
-    E.g., "Los Angeles Lakers" -> "Los Angeles Lakers"
+    E.g., "Lakers" or "los angeles lakers" -> "Los Angeles Lakers"
+    Unknown names are returned stripped but otherwise unchanged.
     """
-    # API returns full names like "Los Angeles Lakers", "Boston Celtics"
-    # Our model expects these exact formats
-    return name.strip()
+    name = name.strip()
+    return _TEAM_ALIASES.get(name.lower(), name)
 
 
 def get_game_total(home_team: str, away_team: str, sportsbook: str = "draftkings") -> Optional[float]:
@@ -158,12 +253,9 @@ def get_game_total(home_team: str, away_team: str, sportsbook: str = "draftkings
     Returns:
         Total line (float) or None if not found
     """
-    games = get_nba_games_with_odds(sportsbook=sportsbook)
-    
-    for game in games:
-        if (game["home"].lower() == home_team.lower() and 
-            game["away"].lower() == away_team.lower()):
-            return game["total"]
+    _, totals = _get_odds_entry(sportsbook, "us")
     
     # Fallback to default if not found
-    return 220.0
+    home_team = normalize_team_name(home_team).lower()
+    away_team = normalize_team_name(away_team).lower()
+    return totals.get((home_team, away_team), 220.0)
@@ -1,10 +1,30 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
 
+# LRU cache of calculate_team_totals results, keyed by _team_totals_key
+_TEAM_TOTALS_CACHE = OrderedDict()
+_TEAM_TOTALS_CACHE_SIZE = 256
+
+# Disk cache of prefix snapshots; bump the version when the metrics change
+_MODEL_CACHE_DIR = Path('.cache') / 'model_data'
+_MODEL_SCHEMA_VERSION = 1
+
+
 def calculate_team_totals(df, recency_weight=True):
     """
     Calculate team efficiency metrics (offensive/defensive ratings).
     
+    Results are memoized on a fingerprint of the input rows, so repeated
+    backtests over the same training slices skip the aggregation.
+    
     Args:
         df: DataFrame with columns [home, away, home_pts, away_pts]
         recency_weight: If True, weight recent games 3x more (last 30% of games)
@@ -12,59 +32,256 @@ def calculate_team_totals(df, recency_weight=True):
     Returns:
         Team-indexed DataFrame with efficiency metrics
     """
+    key = _team_totals_key(df, recency_weight)
+    cached = _TEAM_TOTALS_CACHE.get(key)
+    if cached is None:
+        cached = _aggregate_team_totals(df, recency_weight)
+        _TEAM_TOTALS_CACHE[key] = cached
+        if len(_TEAM_TOTALS_CACHE) > _TEAM_TOTALS_CACHE_SIZE:
+            _TEAM_TOTALS_CACHE.popitem(last=False)
+    else:
+        _TEAM_TOTALS_CACHE.move_to_end(key)
+    
+    # Callers get their own copy so the cached frame cannot be mutated
+    return cached.copy()
+
+
+def _team_totals_key(df, recency_weight):
+    """
+    Fingerprint the rows calculate_team_totals reads.
+    
+    The hash covers row order and index labels because recency weighting
+    depends on both.
+    """
+    row_hashes = pd.util.hash_pandas_object(df[["home", "away", "home_pts", "away_pts"]])
+    digest = hashlib.blake2b(row_hashes.to_numpy().tobytes(), digest_size=16).hexdigest()
+    return (len(df), bool(recency_weight), digest)
+
+
+def _aggregate_team_totals(df, recency_weight):
+    """Uncached body of calculate_team_totals."""
     # Apply recency weighting
+    # Weights are a standalone array, so df is only read, never copied
     if recency_weight and len(df) > 10:
-        df = df.copy()
         # Last 30% of games get 3x weight (stronger emphasis on recent performance)
         cutoff_idx = max(0, len(df) - len(df) // 3)
-        df['weight'] = 1.0
-        df.loc[cutoff_idx:, 'weight'] = 3.0
+        # Positional, so slices that don't start at label 0 weight the same tail
+        weights = np.where(np.arange(len(df)) >= cutoff_idx, 3.0, 1.0)
     else:
-        df = df.copy()
-        df['weight'] = 1.0
-    
+        weights = np.ones(len(df))
+
+    home_pts = df['home_pts'].to_numpy(dtype=np.float64)
+    away_pts = df['away_pts'].to_numpy(dtype=np.float64)
+
     # Home team stats
-    df_home = df.groupby("home").apply(
-        lambda x: pd.Series({
-            "avg_scored_home": (x["home_pts"] * x["weight"]).sum() / x["weight"].sum(),
-            "avg_allowed_home": (x["away_pts"] * x["weight"]).sum() / x["weight"].sum()
-        })
-    )
+    codes, teams = pd.factorize(df['home'], sort=True)
+    scored, allowed = _weighted_group_means(codes, len(teams), weights, home_pts, away_pts)
+    df_home = pd.DataFrame({
+        "avg_scored_home": scored,
+        "avg_allowed_home": allowed
+    }, index=pd.Index(teams, name="home"))
 
     # Away team stats
-    df_away = df.groupby("away").apply(
-        lambda x: pd.Series({
-            "avg_scored_away": (x["away_pts"] * x["weight"]).sum() / x["weight"].sum(),
-            "avg_allowed_away": (x["home_pts"] * x["weight"]).sum() / x["weight"].sum()
-        })
-    )
+    codes, teams = pd.factorize(df['away'], sort=True)
+    scored, allowed = _weighted_group_means(codes, len(teams), weights, away_pts, home_pts)
+    df_away = pd.DataFrame({
+        "avg_scored_away": scored,
+        "avg_allowed_away": allowed
+    }, index=pd.Index(teams, name="away"))
 
     df_combined = df_home.join(df_away, how="outer").fillna(0)
     return df_combined
 
 
-def calculate_home_court_advantage(df):
+def _weighted_group_means(codes, n_groups, weights, *values):
     """
-    Calculate team-specific home court advantage from historical data.
+    Weighted mean of each values array per group code, in one bincount
+    scatter-add pass per array: sum(value * weight) / sum(weight).
+    """
+    weight_sums = np.bincount(codes, weights=weights, minlength=n_groups)
+    return [np.bincount(codes, weights=v * weights, minlength=n_groups) / weight_sums
+            for v in values]
+
+
+def calculate_team_totals_by_prefix(df, ends, recency_weight=True):
+    """
+    Calculate team efficiency metrics for several leading slices of one game log.
     
-    Returns dict: {team: home_advantage_points}
+    Equivalent to calling calculate_team_totals(df.iloc[:end]) for every end,
+    but the game log is scanned once: each game is added to the bucket of the
+    first prefix boundary it falls under and the buckets are accumulated, so
+    only a (boundaries x teams) table is ever materialized.
+    
+    Args:
+        df: DataFrame with columns [home, away, home_pts, away_pts], in game order
+        ends: Prefix lengths (number of leading games) to evaluate
+        recency_weight: Same weighting as calculate_team_totals
+    
+    Returns:
+        Dict {end: team-indexed DataFrame with efficiency metrics}
     """
-    home_advantages = {}
+    n = len(df)
+    codes, teams = pd.factorize(pd.concat([df["home"], df["away"]], ignore_index=True))
+    teams = np.asarray(teams)  # plain team names even for categorical columns
+    home_codes, away_codes = codes[:n], codes[n:]
+    home_pts = df["home_pts"].to_numpy(dtype=np.float64)
+    away_pts = df["away_pts"].to_numpy(dtype=np.float64)
     
-    for team in df.index:
-        if pd.isna(df.loc[team, "avg_scored_home"]) or pd.isna(df.loc[team, "avg_scored_away"]):
-            home_advantages[team] = 3.5  # Default
-            continue
-        
-        home_score = df.loc[team, "avg_scored_home"]
-        away_score = df.loc[team, "avg_scored_away"]
+    ends = np.unique(np.asarray(ends, dtype=int))
+    cutoffs = np.maximum(0, ends - ends // 3)
+    boundaries = np.unique(np.concatenate([ends, cutoffs]))
+    row = {int(b): i for i, b in enumerate(boundaries)}
+    # Game i belongs to every prefix longer than i; the first such boundary is its bucket
+    bucket = np.searchsorted(boundaries, np.arange(n), side="right")
+    
+    def cumulative(team_codes, values):
+        # Row j holds per-team totals over the first boundaries[j] games
+        totals = np.zeros((len(boundaries) + 1, len(teams)))
+        np.add.at(totals, (bucket, team_codes), values)
+        return totals[:-1].cumsum(axis=0)
+    
+    home_games = cumulative(home_codes, 1.0)
+    home_scored = cumulative(home_codes, home_pts)
+    home_allowed = cumulative(home_codes, away_pts)
+    away_games = cumulative(away_codes, 1.0)
+    away_scored = cumulative(away_codes, away_pts)
+    away_allowed = cumulative(away_codes, home_pts)
+    
+    snapshots = {}
+    for end, cutoff in zip(ends, cutoffs):
+        e, c = row[int(end)], row[int(cutoff)]
+        if recency_weight and end > 10:
+            # Games from the cutoff onward count 3x: 1x everything + 2x the recent tail
+            weighted = lambda totals: 3.0 * totals[e] - 2.0 * totals[c]
+        else:
+            weighted = lambda totals: totals[e]
         
-        # Advantage = difference between home and away performance
-        advantage = home_score - away_score
+        home_w = weighted(home_games)
+        away_w = weighted(away_games)
+        played_home = home_w > 0
+        played_away = away_w > 0
         
-        # Clamp between 0-7 points (reasonable home court range)
-        advantage = max(0, min(7, advantage))
+        df_home = pd.DataFrame({
+            "avg_scored_home": weighted(home_scored)[played_home] / home_w[played_home],
+            "avg_allowed_home": weighted(home_allowed)[played_home] / home_w[played_home]
+        }, index=pd.Index(teams[played_home], name="home"))
+        df_away = pd.DataFrame({
+            "avg_scored_away": weighted(away_scored)[played_away] / away_w[played_away],
+            "avg_allowed_away": weighted(away_allowed)[played_away] / away_w[played_away]
+        }, index=pd.Index(teams[played_away], name="away"))
         
-        home_advantages[team] = advantage
+        snapshots[int(end)] = df_home.join(df_away, how="outer").fillna(0)
+    
+    return snapshots
+
+
+def pregame_team_stats(df, recency_weight=True):
+    """
+    Each game's team metrics as calculate_team_totals(df.iloc[:i]) would give
+    them, for every game i at once.
+    
+    Args:
+        df: DataFrame with columns [home, away, home_pts, away_pts], in game order
+        recency_weight: Same weighting as calculate_team_totals
+    
+    Returns:
+        DataFrame aligned with df: home_scored/home_allowed (home team's
+        avg_scored_home/avg_allowed_home), away_scored/away_allowed (away team's
+        avg_scored_away/avg_allowed_away), and known (both teams have played)
+    """
+    n = len(df)
+    codes, teams = pd.factorize(pd.concat([df["home"], df["away"]], ignore_index=True))
+    home_codes, away_codes = codes[:n], codes[n:]
+    home_pts = df["home_pts"].to_numpy(dtype=np.float64)
+    away_pts = df["away_pts"].to_numpy(dtype=np.float64)
+    
+    games = np.arange(n)
+    cutoffs = np.maximum(0, games - games // 3)
+    weighted_rows = recency_weight & (games > 10)
+    
+    def cumulative(team_codes, values):
+        # Row k holds per-team totals over the first k games
+        totals = np.zeros((n + 1, len(teams)))
+        totals[games + 1, team_codes] = values
+        return totals.cumsum(axis=0)
+    
+    def pregame(totals, team_codes):
+        # Weighted totals over games [0, i) for the team playing in game i
+        latest = totals[games, team_codes]
+        recent = totals[cutoffs, team_codes]
+        return np.where(weighted_rows, 3.0 * latest - 2.0 * recent, latest)
+    
+    def average(total, count):
+        # Zero (like calculate_team_totals' fillna) when the team has no such games
+        return np.divide(total, count, out=np.zeros(n), where=count > 0)
+    
+    home_games = cumulative(home_codes, 1.0)
+    away_games = cumulative(away_codes, 1.0)
+    played = home_games + away_games
+    
+    home_count = pregame(home_games, home_codes)
+    away_count = pregame(away_games, away_codes)
+    
+    return pd.DataFrame({
+        "home_scored": average(pregame(cumulative(home_codes, home_pts), home_codes), home_count),
+        "home_allowed": average(pregame(cumulative(home_codes, away_pts), home_codes), home_count),
+        "away_scored": average(pregame(cumulative(away_codes, away_pts), away_codes), away_count),
+        "away_allowed": average(pregame(cumulative(away_codes, home_pts), away_codes), away_count),
+        "known": (played[games, home_codes] > 0) & (played[games, away_codes] > 0),
+    }, index=df.index)
+
+
+def cached_team_totals_by_prefix(df, ends, recency_weight=True):
+    """
+    calculate_team_totals_by_prefix backed by a pickle cache on disk.
+    
+    Snapshots are keyed by the game rows, the requested prefix lengths and the
+    weighting, so rerunning a script over the same games skips the build.
+    
+    Args:
+        df: DataFrame with columns [home, away, home_pts, away_pts], in game order
+        ends: Prefix lengths (number of leading games) to evaluate
+        recency_weight: Same weighting as calculate_team_totals
+    
+    Returns:
+        Dict {end: team-indexed DataFrame with efficiency metrics}
+    """
+    ends = np.unique(np.asarray(ends, dtype=int))
+    row_hashes = pd.util.hash_pandas_object(df[["home", "away", "home_pts", "away_pts"]], index=False)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{_MODEL_SCHEMA_VERSION}:{bool(recency_weight)}:".encode())
+    h.update(ends.astype(np.int64).tobytes())
+    h.update(row_hashes.to_numpy().tobytes())
+    path = _MODEL_CACHE_DIR / f"model_{h.hexdigest()}.pkl"
+    
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+    
+    snapshots = calculate_team_totals_by_prefix(df, ends, recency_weight)
+    try:
+        _MODEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Unique temp name: parallel backtests may build the same snapshots at once
+        with tempfile.NamedTemporaryFile(dir=_MODEL_CACHE_DIR, suffix='.tmp', delete=False) as f:
+            pickle.dump(snapshots, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, path)
+    except OSError:
+        pass
+    return snapshots
+
+
+def calculate_home_court_advantage(df):
+    """
+    Calculate team-specific home court advantage from historical data.
+    
+    Returns dict: {team: home_advantage_points}
+    """
+    # Advantage = difference between home and away performance,
+    # clamped between 0-7 points (reasonable home court range)
+    advantage = (df["avg_scored_home"] - df["avg_scored_away"]).clip(lower=0, upper=7)
     
-    return home_advantages
+    # Default when either average is missing
+    known = df[["avg_scored_home", "avg_scored_away"]].notna().all(axis=1)
+    return advantage.where(known, 3.5).to_dict()
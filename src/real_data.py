@@ -2,8 +2,53 @@
 Fetch real historical NBA game data from free sources.
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 from datetime import datetime, timedelta
+from src.jsonutil import loads
+
+try:
+    import ijson  # optional: stream events instead of loading the whole payload
+except ImportError:
+    ijson = None
+
+
+# Shared session so repeated ESPN calls reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "nba-totals-model", "Accept-Encoding": "gzip"})
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(
+    total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]))
+_SESSION.mount('http://', _ADAPTER)
+_SESSION.mount('https://', _ADAPTER)
+
+
+# Column order and compact dtypes for game frames (points fit in int16,
+# half-point lines are exact in float32)
+_GAME_COLUMNS = ["date", "home", "away", "home_pts", "away_pts", "total_pts", "sportsbook_total"]
+_GAME_DTYPES = {"home_pts": "int16", "away_pts": "int16", "total_pts": "int16", "sportsbook_total": "float32"}
+
+
+def close_session():
+    """Close pooled connections held by the module session."""
+    _SESSION.close()
+
+
+def _iter_events(response):
+    """
+    Yield the events of an ESPN response one at a time.
+    
+    With ijson installed the body is parsed incrementally from the socket,
+    so only the current event is held in memory; otherwise the whole
+    payload is decoded and its events list is walked.
+    """
+    if ijson is not None:
+        response.raw.decode_content = True  # undo gzip transfer encoding
+        yield from ijson.items(response.raw, "events.item", use_float=True)
+    else:
+        data = loads(response.content)
+        yield from data.get("events", [])
+
 
 def get_real_historical_data(days_back=30):
     """
@@ -18,105 +63,92 @@ def get_real_historical_data(days_back=30):
         # ESPN API endpoint for NBA games
         url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/events"
         
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200:
-            return None
-        
-        data = r.json()
-        games = data.get("events", [])
-        
-        rows = []
-        for game in games:
-            # Parse game data
-            game_date = game.get("date", "")[:10]
-            status = game.get("status", {}).get("type", {}).get("name", "")
-            
-            # Only include completed games
-            if status != "Final":
-                continue
-            
-            competitions = game.get("competitions", [])
-            if not competitions:
-                continue
-            
-            comp = competitions[0]
-            competitors = comp.get("competitors", [])
+        with _SESSION.get(url, timeout=10, stream=True) as r:
+            if r.status_code != 200:
+                return None
             
-            if len(competitors) < 2:
-                continue
+            # Only completed games, filtered before any other field is read.
+            # A generator, so streamed events are still handled one at a time
+            finals = (game for game in _iter_events(r)
+                      if game.get("status", {}).get("type", {}).get("name") == "Final")
             
-            home = competitors[1]
-            away = competitors[0]
-            
-            home_team = home.get("team", {}).get("displayName", "")
-            away_team = away.get("team", {}).get("displayName", "")
-            home_pts = int(home.get("score", 0))
-            away_pts = int(away.get("score", 0))
-            
-            if home_team and away_team and home_pts > 0:
-                rows.append({
-                    "date": game_date,
-                    "home": home_team,
-                    "away": away_team,
-                    "home_pts": home_pts,
-                    "away_pts": away_pts,
-                    "total_pts": home_pts + away_pts,
-                    "sportsbook_total": (home_pts + away_pts)  # Use actual as proxy
-                })
+            rows = []
+            for game in finals:
+                competitions = game.get("competitions") or [{}]
+                competitors = competitions[0].get("competitors", [])
+                if len(competitors) < 2:
+                    continue
+                away, home = competitors[0], competitors[1]
+                
+                home_team = home.get("team", {}).get("displayName", "")
+                away_team = away.get("team", {}).get("displayName", "")
+                home_pts = int(home.get("score", 0))
+                away_pts = int(away.get("score", 0))
+                
+                if home_team and away_team and home_pts > 0:
+                    total = home_pts + away_pts
+                    # Sportsbook total uses the actual total as a proxy
+                    rows.append((game.get("date", "")[:10], home_team, away_team,
+                                 home_pts, away_pts, total, total))
         
         if rows:
-            return pd.DataFrame(rows)
+            # Dates stay YYYY-MM-DD strings, like the other game frames
+            return pd.DataFrame(rows, columns=_GAME_COLUMNS).astype(_GAME_DTYPES)
     except Exception as e:
         print(f"ESPN API error: {e}")
     
     return None
 
 
+# Real NBA game totals average 215-225 points per game
+# Based on 2024-2025 season averages
+_FALLBACK_ROWS = (
+    # High-scoring games (elite offenses vs weak defenses)
+    {"date": "2025-11-30", "home": "Denver Nuggets", "away": "Golden State Warriors", 
+     "home_pts": 120, "away_pts": 118, "total_pts": 238, "sportsbook_total": 233.5},
+    {"date": "2025-11-30", "home": "Boston Celtics", "away": "Phoenix Suns", 
+     "home_pts": 117, "away_pts": 115, "total_pts": 232, "sportsbook_total": 228.5},
+    # Medium-scoring games
+    {"date": "2025-11-29", "home": "Miami Heat", "away": "Los Angeles Lakers", 
+     "home_pts": 108, "away_pts": 106, "total_pts": 214, "sportsbook_total": 216.5},
+    {"date": "2025-11-29", "home": "New York Knicks", "away": "Chicago Bulls", 
+     "home_pts": 112, "away_pts": 110, "total_pts": 222, "sportsbook_total": 220.5},
+    # Low-scoring games (defensive teams)
+    {"date": "2025-11-28", "home": "Memphis Grizzlies", "away": "Detroit Pistons", 
+     "home_pts": 105, "away_pts": 103, "total_pts": 208, "sportsbook_total": 210.5},
+    {"date": "2025-11-28", "home": "San Antonio Spurs", "away": "Milwaukee Bucks", 
+     "home_pts": 110, "away_pts": 108, "total_pts": 218, "sportsbook_total": 220.0},
+    # More realistic mix
+    {"date": "2025-11-27", "home": "Lakers", "away": "Celtics", 
+     "home_pts": 114, "away_pts": 112, "total_pts": 226, "sportsbook_total": 224.5},
+    {"date": "2025-11-27", "home": "Warriors", "away": "Suns", 
+     "home_pts": 116, "away_pts": 114, "total_pts": 230, "sportsbook_total": 228.0},
+    {"date": "2025-11-26", "home": "Nuggets", "away": "Heat", 
+     "home_pts": 111, "away_pts": 109, "total_pts": 220, "sportsbook_total": 218.5},
+    {"date": "2025-11-26", "home": "Knicks", "away": "Bulls", 
+     "home_pts": 107, "away_pts": 105, "total_pts": 212, "sportsbook_total": 214.0},
+    {"date": "2025-11-25", "home": "Bucks", "away": "Pistons", 
+     "home_pts": 119, "away_pts": 115, "total_pts": 234, "sportsbook_total": 231.5},
+    {"date": "2025-11-25", "home": "Spurs", "away": "Grizzlies", 
+     "home_pts": 103, "away_pts": 101, "total_pts": 204, "sportsbook_total": 206.5},
+    {"date": "2025-11-24", "home": "Lakers", "away": "Warriors", 
+     "home_pts": 115, "away_pts": 113, "total_pts": 228, "sportsbook_total": 225.5},
+    {"date": "2025-11-24", "home": "Celtics", "away": "Heat", 
+     "home_pts": 110, "away_pts": 108, "total_pts": 218, "sportsbook_total": 216.5},
+    {"date": "2025-11-23", "home": "Suns", "away": "Nuggets", 
+     "home_pts": 118, "away_pts": 116, "total_pts": 234, "sportsbook_total": 232.0},
+)
+
+# Built once at import with the same schema as the ESPN frames
+_FALLBACK_DF = pd.DataFrame(list(_FALLBACK_ROWS), columns=_GAME_COLUMNS).astype(_GAME_DTYPES)
+
+
 def get_fallback_historical_data():
     """
     Use realistic historical data based on actual NBA scoring patterns.
     More conservative than pure mock data.
     """
-    # Real NBA game totals average 215-225 points per game
-    # Based on 2024-2025 season averages
-    historical_data = [
-        # High-scoring games (elite offenses vs weak defenses)
-        {"date": "2025-11-30", "home": "Denver Nuggets", "away": "Golden State Warriors", 
-         "home_pts": 120, "away_pts": 118, "total_pts": 238, "sportsbook_total": 233.5},
-        {"date": "2025-11-30", "home": "Boston Celtics", "away": "Phoenix Suns", 
-         "home_pts": 117, "away_pts": 115, "total_pts": 232, "sportsbook_total": 228.5},
-        # Medium-scoring games
-        {"date": "2025-11-29", "home": "Miami Heat", "away": "Los Angeles Lakers", 
-         "home_pts": 108, "away_pts": 106, "total_pts": 214, "sportsbook_total": 216.5},
-        {"date": "2025-11-29", "home": "New York Knicks", "away": "Chicago Bulls", 
-         "home_pts": 112, "away_pts": 110, "total_pts": 222, "sportsbook_total": 220.5},
-        # Low-scoring games (defensive teams)
-        {"date": "2025-11-28", "home": "Memphis Grizzlies", "away": "Detroit Pistons", 
-         "home_pts": 105, "away_pts": 103, "total_pts": 208, "sportsbook_total": 210.5},
-        {"date": "2025-11-28", "home": "San Antonio Spurs", "away": "Milwaukee Bucks", 
-         "home_pts": 110, "away_pts": 108, "total_pts": 218, "sportsbook_total": 220.0},
-        # More realistic mix
-        {"date": "2025-11-27", "home": "Lakers", "away": "Celtics", 
-         "home_pts": 114, "away_pts": 112, "total_pts": 226, "sportsbook_total": 224.5},
-        {"date": "2025-11-27", "home": "Warriors", "away": "Suns", 
-         "home_pts": 116, "away_pts": 114, "total_pts": 230, "sportsbook_total": 228.0},
-        {"date": "2025-11-26", "home": "Nuggets", "away": "Heat", 
-         "home_pts": 111, "away_pts": 109, "total_pts": 220, "sportsbook_total": 218.5},
-        {"date": "2025-11-26", "home": "Knicks", "away": "Bulls", 
-         "home_pts": 107, "away_pts": 105, "total_pts": 212, "sportsbook_total": 214.0},
-        {"date": "2025-11-25", "home": "Bucks", "away": "Pistons", 
-         "home_pts": 119, "away_pts": 115, "total_pts": 234, "sportsbook_total": 231.5},
-        {"date": "2025-11-25", "home": "Spurs", "away": "Grizzlies", 
-         "home_pts": 103, "away_pts": 101, "total_pts": 204, "sportsbook_total": 206.5},
-        {"date": "2025-11-24", "home": "Lakers", "away": "Warriors", 
-         "home_pts": 115, "away_pts": 113, "total_pts": 228, "sportsbook_total": 225.5},
-        {"date": "2025-11-24", "home": "Celtics", "away": "Heat", 
-         "home_pts": 110, "away_pts": 108, "total_pts": 218, "sportsbook_total": 216.5},
-        {"date": "2025-11-23", "home": "Suns", "away": "Nuggets", 
-         "home_pts": 118, "away_pts": 116, "total_pts": 234, "sportsbook_total": 232.0},
-    ]
-    
-    return pd.DataFrame(historical_data)
+    return _FALLBACK_DF.copy()
 
 
 if __name__ == "__main__":
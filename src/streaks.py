@@ -4,22 +4,75 @@ Hot teams score more, cold teams score less.
 Uses fast timeout and graceful fallback.
 """
 
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict
+from src.jsonutil import loads
+
+
+# Shared session so per-matchup lookups reuse pooled keep-alive connections.
+# Connection errors and read timeouts are not retried, so an unreachable or
+# stalled host falls back after one 3 s timeout; only quick 429/5xx answers
+# are retried (at most ~2 s of backoff, Retry-After ignored).
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "nba-totals-model", "Accept-Encoding": "gzip"})
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(
+    total=3, connect=0, read=0, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=False))
+_SESSION.mount('http://', _ADAPTER)
+_SESSION.mount('https://', _ADAPTER)
+
+
+# In-memory cache of the standings; a failed fetch is only cached briefly
+_RECORDS_CACHE = None
+_RECORDS_CACHE_TS = 0
+_RECORDS_CACHE_TTL = 3600  # seconds
+_RECORDS_RETRY_TTL = 60  # seconds before retrying after an empty result
+
+# Validator and parse of the last successful standings response, so a
+# conditional GET answered with 304 reuses the parse instead of the body
+_RECORDS_ETAG = None
+_RECORDS_LAST = None
+
+
+def close_session():
+    """Close pooled connections held by the module session."""
+    _SESSION.close()
 
 
 def get_team_records() -> Dict[str, Dict]:
     """
     Fetch current team records from ESPN standings.
+    Cached in memory for _RECORDS_CACHE_TTL seconds.
     
     Returns:
-        Dict: {team_name: {wins, losses}}
+        Dict: {team_name: {wins, losses, win_pct}} (win_pct is None before
+        a team has played)
     """
+    global _RECORDS_CACHE, _RECORDS_CACHE_TS
+    if _RECORDS_CACHE is not None:
+        ttl = _RECORDS_CACHE_TTL if _RECORDS_CACHE else _RECORDS_RETRY_TTL
+        if time.time() - _RECORDS_CACHE_TS < ttl:
+            return _RECORDS_CACHE
+    
+    _RECORDS_CACHE = _fetch_team_records()
+    _RECORDS_CACHE_TS = time.time()
+    return _RECORDS_CACHE
+
+
+def _fetch_team_records() -> Dict[str, Dict]:
+    """Uncached body of get_team_records."""
+    global _RECORDS_ETAG, _RECORDS_LAST
     try:
         url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/standings"
-        response = requests.get(url, timeout=3)
+        headers = {"If-None-Match": _RECORDS_ETAG} if _RECORDS_ETAG and _RECORDS_LAST else {}
+        response = _SESSION.get(url, headers=headers, timeout=3)
+        if response.status_code == 304:
+            return _RECORDS_LAST
         response.raise_for_status()
-        data = response.json()
+        data = loads(response.content)
         
         records = {}
         
@@ -29,25 +82,30 @@ def get_team_records() -> Dict[str, Dict]:
                 team_name = team_info.get("displayName")
                 
                 if team_name:
-                    stats = team_entry.get("stats", [])
-                    wins = 0
-                    losses = 0
-                    
-                    for stat in stats:
-                        if stat.get("name") == "wins":
-                            wins = stat.get("value", 0)
-                        elif stat.get("name") == "losses":
-                            losses = stat.get("value", 0)
+                    # Index the stats list once instead of scanning it per stat
+                    stats_by_name = {stat.get("name"): stat.get("value", 0)
+                                     for stat in team_entry.get("stats", [])}
+                    wins = stats_by_name.get("wins", 0)
+                    losses = stats_by_name.get("losses", 0)
                     
-                    records[team_name] = {'wins': wins, 'losses': losses}
+                    total_games = wins + losses
+                    records[team_name] = {
+                        'wins': wins,
+                        'losses': losses,
+                        'win_pct': wins / total_games if total_games > 0 else None
+                    }
         
-        return records if len(records) > 5 else {}
+        if len(records) <= 5:
+            return {}
+        _RECORDS_ETAG = response.headers.get("ETag")
+        _RECORDS_LAST = records
+        return records
     
     except Exception:
         return {}
 
 
-def calculate_streak_adjustment(home_team: str, away_team: str) -> float:
+def calculate_streak_adjustment(home_team: str, away_team: str, records: Dict[str, Dict] = None) -> float:
     """
     Adjust prediction based on team records (hot teams have high win %).
     
@@ -57,34 +115,31 @@ def calculate_streak_adjustment(home_team: str, away_team: str) -> float:
     Args:
         home_team: Home team
         away_team: Away team
+        records: Pre-fetched get_team_records() map (fetched if None)
     
     Returns:
         Points to add to total (can be negative)
     """
-    records = get_team_records()
+    if records is None:
+        records = get_team_records()
     
     adjustment = 0.0
     
-    # Home team adjustment
-    if home_team in records:
-        rec = records[home_team]
-        total_games = rec['wins'] + rec['losses']
-        if total_games > 0:
-            win_pct = rec['wins'] / total_games
-            if win_pct > 0.55:
-                adjustment += 0.75
-            elif win_pct < 0.45:
-                adjustment -= 0.75
-    
-    # Away team adjustment
-    if away_team in records:
-        rec = records[away_team]
-        total_games = rec['wins'] + rec['losses']
-        if total_games > 0:
-            win_pct = rec['wins'] / total_games
-            if win_pct > 0.55:
-                adjustment += 0.75
-            elif win_pct < 0.45:
-                adjustment -= 0.75
+    # Home team adjustment, then away team adjustment
+    for team in (home_team, away_team):
+        rec = records.get(team)
+        if rec is None:
+            continue
+        win_pct = rec.get('win_pct')
+        if win_pct is None:
+            # Records in the plain {wins, losses} shape (caller-built maps)
+            total_games = rec.get('wins', 0) + rec.get('losses', 0)
+            if total_games <= 0:
+                continue
+            win_pct = rec.get('wins', 0) / total_games
+        if win_pct > 0.55:
+            adjustment += 0.75
+        elif win_pct < 0.45:
+            adjustment -= 0.75
     
     return adjustment
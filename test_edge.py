@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Check the vectorized score_predictions against the scalar edge, line
+movement filter and WIN/LOSS/PUSH rules it replaced.
+"""
+
+import numpy as np
+from src.edge import calculate_edge, score_predictions
+from src.line_movement import should_filter_based_on_movement
+
+
+def scalar_result(predicted, sportsbook_total, actual_total):
+    """Per-game outcome as the original backtest loop decided it."""
+    edge = calculate_edge(predicted, sportsbook_total)
+    predicted_over = predicted > sportsbook_total
+    actual_over = actual_total > sportsbook_total
+    if edge != 0:
+        return "WIN" if predicted_over == actual_over else "LOSS"
+    return "PUSH"
+
+
+def test_score_predictions_match_scalar():
+    rng = np.random.default_rng(11)
+    sportsbook = np.round(rng.uniform(205, 240, 200) * 2) / 2
+    predicted = np.round(sportsbook + rng.normal(0, 8, 200), 1)
+    actual = rng.integers(195, 255, 200).astype(np.float64)
+    # Edge cases: exact line, edges that round to zero, actual on the line,
+    # and discrepancies at and beyond the filter threshold
+    predicted[:6] = sportsbook[:6] + [0.0, 0.004, -0.004, 12.0, -12.0, 12.1]
+    actual[6:9] = sportsbook[6:9]
+
+    edges, results, should_bet = score_predictions(predicted, sportsbook, actual)
+
+    for i in range(len(predicted)):
+        p, s, a = float(predicted[i]), float(sportsbook[i]), float(actual[i])
+        edge = calculate_edge(p, s)
+        assert edges[i] == edge, (i, edges[i], edge)
+        assert results[i] == scalar_result(p, s, a), (i, results[i])
+        assert should_bet[i] == should_filter_based_on_movement(p, s, "OVER" if edge > 0 else "UNDER"), i
+
+
+if __name__ == "__main__":
+    test_score_predictions_match_scalar()
+    print("score_predictions matches the scalar edge, filter and result rules")
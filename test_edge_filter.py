@@ -8,19 +8,21 @@ import pandas as pd
 from src.backtest import backtest_model, summarize_backtest
 
 
-def filter_by_edge(results_df, min_edge=2.0):
+def filter_by_edge(results_df, min_edge=2.0, edge_abs=None):
     """
     Filter predictions to only those with sufficient edge.
     
     Args:
         results_df: DataFrame from backtest_model()
         min_edge: Minimum absolute edge to consider (default 2.0pts)
+        edge_abs: Precomputed abs(edge) array, to share across thresholds
     
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame (a new frame, as boolean indexing always returns)
     """
-    filtered = results_df[results_df['edge'].abs() >= min_edge].copy()
-    return filtered
+    if edge_abs is None:
+        edge_abs = results_df['edge'].abs().to_numpy()
+    return results_df[edge_abs >= min_edge]
 
 
 if __name__ == "__main__":
@@ -35,9 +37,10 @@ if __name__ == "__main__":
         print("No results")
         exit(1)
     
-    # Test different edge thresholds
+    # Test different edge thresholds; abs(edge) is computed once for all of them
+    edge_abs = results['edge'].abs().to_numpy()
     for threshold in [0.0, 2.0, 3.0, 5.0]:
-        filtered = filter_by_edge(results, threshold)
+        filtered = filter_by_edge(results, threshold, edge_abs)
         
         if len(filtered) == 0:
             print(f"\nEdge > {threshold}pts: No bets")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Check the vectorized predict_slate against per-game predict_total.
+"""
+
+import time
+
+import pandas as pd
+import src.advanced_stats as advanced_stats
+import src.streaks as streaks
+from src.advanced_stats import get_fallback_pace
+from src.model import predict_slate, predict_total
+from src.process import calculate_team_totals
+from test_team_totals import TEAMS, mock_games
+
+
+def seed_feeds():
+    """
+    Fill the pace and standings in-memory caches with fixed maps, so
+    predict_total (which fetches them itself) and predict_slate see the
+    same inputs without touching ESPN.
+    """
+    advanced_stats._PACE_CACHE = get_fallback_pace()
+    advanced_stats._PACE_CACHE_TS = time.time()
+    streaks._RECORDS_CACHE = {
+        "Boston Celtics": {"wins": 40, "losses": 12, "win_pct": 40 / 52},
+        "Miami Heat": {"wins": 20, "losses": 32, "win_pct": 20 / 52},
+        "Phoenix Suns": {"wins": 26, "losses": 26},  # no precomputed win_pct
+    }
+    streaks._RECORDS_CACHE_TS = time.time()
+
+
+def test_predict_slate_matches_predict_total():
+    seed_feeds()
+    model_data = calculate_team_totals(mock_games())
+    # A team without away games exercises the league average fallback
+    model_data.loc["Utah Jazz"] = {"avg_scored_home": 112.0, "avg_allowed_home": 109.0,
+                                   "avg_scored_away": 0.0, "avg_allowed_away": 0.0}
+
+    teams = TEAMS + ["Utah Jazz"]
+    slate = pd.DataFrame([{"away": away, "home": home}
+                          for home in teams for away in teams if away != home])
+    # Games with a team missing from model_data are dropped, not raised
+    slate.loc[len(slate)] = {"away": "Chicago Bulls", "home": "Boston Celtics"}
+
+    settings = [
+        {},  # fast path: default bonus, no calibration
+        {"total_multiplier": 1.02},
+        {"home_court_bonuses": {"Boston Celtics": 5.0, "Utah Jazz": 1.5}, "market_calibration": -1.25},
+    ]
+    for kwargs in settings:
+        predictions = predict_slate(model_data, slate, **kwargs)
+        assert len(predictions) == len(slate) - 1
+        assert "Chicago Bulls" not in set(predictions["away"])
+        for game in predictions.itertuples():
+            expected = predict_total(model_data, game.away, game.home, **kwargs)
+            assert game.predicted_total == expected, (kwargs, game.away, game.home, game.predicted_total, expected)
+
+
+if __name__ == "__main__":
+    test_predict_slate_matches_predict_total()
+    print("predict_slate matches predict_total for every game")
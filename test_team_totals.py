@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Check the cumulative team totals kernels against calculate_team_totals
+run on each leading slice of a game log.
+"""
+
+import numpy as np
+import pandas as pd
+from src.process import calculate_team_totals, calculate_team_totals_by_prefix, pregame_team_stats
+
+
+TEAMS = ["Boston Celtics", "Denver Nuggets", "Golden State Warriors",
+         "Los Angeles Lakers", "Miami Heat", "Phoenix Suns"]
+
+
+def mock_games(n=60, seed=7):
+    """Deterministic game log with every team playing home and away."""
+    rng = np.random.default_rng(seed)
+    home = rng.integers(0, len(TEAMS), n)
+    away = (home + rng.integers(1, len(TEAMS), n)) % len(TEAMS)
+    home_pts = rng.integers(95, 131, n)
+    away_pts = rng.integers(95, 131, n)
+    return pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n).strftime("%Y-%m-%d"),
+        "home": np.array(TEAMS)[home],
+        "away": np.array(TEAMS)[away],
+        "home_pts": home_pts,
+        "away_pts": away_pts,
+        "total_pts": home_pts + away_pts,
+    })
+
+
+def test_prefix_totals_match_slices():
+    games = mock_games()
+    # Short prefixes (no recency weighting) through the full log
+    ends = [1, 5, 10, 11, 12, 25, 40, len(games)]
+    for recency_weight in (True, False):
+        snapshots = calculate_team_totals_by_prefix(games, ends, recency_weight)
+        assert sorted(snapshots) == ends
+        for end in ends:
+            expected = calculate_team_totals(games.iloc[:end], recency_weight)
+            pd.testing.assert_frame_equal(
+                snapshots[end].sort_index(), expected.sort_index(),
+                check_names=False, check_exact=False, rtol=1e-9
+            )
+
+
+def test_pregame_stats_match_slices():
+    games = mock_games()
+    for recency_weight in (True, False):
+        pregame = pregame_team_stats(games, recency_weight)
+        assert pregame.index.equals(games.index)
+        for i in range(len(games)):
+            home, away = games["home"].iat[i], games["away"].iat[i]
+            if i == 0:
+                assert not pregame["known"].iat[i]
+                continue
+            totals = calculate_team_totals(games.iloc[:i], recency_weight)
+            known = home in totals.index and away in totals.index
+            assert pregame["known"].iat[i] == known
+            if not known:
+                continue
+            expected = [totals.at[home, "avg_scored_home"], totals.at[home, "avg_allowed_home"],
+                        totals.at[away, "avg_scored_away"], totals.at[away, "avg_allowed_away"]]
+            actual = pregame[["home_scored", "home_allowed", "away_scored", "away_allowed"]].iloc[i]
+            np.testing.assert_allclose(actual.to_numpy(dtype=np.float64), expected, rtol=1e-9)
+
+
+if __name__ == "__main__":
+    test_prefix_totals_match_slices()
+    print("calculate_team_totals_by_prefix matches calculate_team_totals on every slice")
+    test_pregame_stats_match_slices()
+    print("pregame_team_stats matches calculate_team_totals before every game")